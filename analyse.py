@@ -0,0 +1,216 @@
+"""
+Engine analysis of archived games.
+
+Reads games lazily from match.py JSON lines, PDN or game archive files (see
+archive.read_games), replays them with Board and searches every position with
+AI_Algo in a process pool, writing one JSON line per position as results come
+in (in the order they finish, not game order):
+
+    {"game": 12, "ply": 30, "fen": "B:W18,...:B1,...", "move": "14x23",
+     "score": -41.5, "depth": 6, "pv": ["14x23", "27x18"], "nodes": 5210}
+
+score is from the side to move's point of view; moves are in standard notation.
+Positions seen before are analysed once, under the game and ply they first
+occurred at. The seen positions live in a fixed-size table, and only a bounded
+number of batches is in flight at a time (reading stops while the workers are
+behind), so memory use does not grow with the archive. A position pushed out
+of the table by a later one may be analysed again.
+
+Usage: python analyse.py games.ckga [more files ...] --depth 6 --workers 8 --output analysis.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from checkers import AI_Algo, Board, flip, flip_move, position_key
+from archive import read_games
+from notation import from_fen, move_text, to_fen
+
+_worker_ai = None  # The AI_Algo of a worker process, kept for its transposition table
+
+
+class SeenPositions:
+    """
+    Position keys already met, in a direct-mapped table of fixed size: a key
+    replaces whatever key shared its slot, so the table never grows.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.keys = array('Q', bytes(8 * size))
+
+    def add(self, key):
+        """Records key; returns False if it was already there."""
+        slot = key % self.size
+        if self.keys[slot] == key:
+            return False
+        self.keys[slot] = key
+        return True
+
+
+def positions(paths, skip_plies=0):
+    """
+    Replays the games of paths one at a time.
+
+    Parameters:
+    paths (list): Game files, see archive.read_games.
+    skip_plies (int): Opening plies of each game left out.
+
+    Yields:
+    tuple: (game number, ply, board, player to move) for every position with a legal
+    move, the board being reused: use it before asking for the next position.
+    """
+    number = 0
+    for path in paths:
+        for game in read_games(path):
+            board, player = from_fen(game['fen'])
+            for ply, move in enumerate(game['moves']):
+                if ply >= skip_plies:
+                    yield number, ply, board, player
+                board.make_move([tuple(square) for square in move])
+                player = 'B' if player == 'R' else 'R'
+            if len(game['moves']) >= skip_plies and board.get_legal_moves(player):
+                yield number, len(game['moves']), board, player
+            number += 1
+
+
+def batches(paths, seen, size, skip_plies=0):
+    """
+    Yields lists of up to size new positions as (game, ply, bitboards, player),
+    skipping those already in seen.
+    """
+    batch = []
+    for game, ply, board, player in positions(paths, skip_plies):
+        if seen.add(position_key(board, player)):
+            batch.append((game, ply, board.bitboards(), player))
+            if len(batch) == size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def _init_worker(tt_size, weights):
+    global _worker_ai
+    _worker_ai = AI_Algo(Board(), tt_size, weights=weights)
+
+
+def analyse_batch(batch, depth, time_ms):
+    """
+    Worker side: searches each position of a batch.
+
+    Returns:
+    list: One result dict per position, see the module docstring.
+    """
+    ai = _worker_ai
+    results = []
+    for game, ply, position, player in batch:
+        # AI_Algo plays Red; Black's positions are searched turned around
+        ai.board.load_bitboards(*(position if player == 'R' else flip(*position)))
+        move, iterations = ai.best_move(time_limit_ms=time_ms, max_depth=depth, return_stats=True)
+        last = iterations[-1] if iterations else {}
+        pv = last.get('pv', [move])
+        if player == 'B':
+            move = flip_move(move)
+            pv = [flip_move(m) for m in pv]
+
+        board = Board()
+        board.load_bitboards(*position)
+        results.append({
+            'game': game,
+            'ply': ply,
+            'fen': to_fen(board, player),
+            'move': move_text(move),
+            'score': last.get('score'),
+            'depth': last.get('depth', 0),
+            'pv': [move_text(m) for m in pv],
+            'nodes': sum(it['nodes'] + it['quiescence_nodes'] for it in iterations),
+        })
+    return results
+
+
+def run_analysis(paths, out, depth=6, time_ms=None, workers=None, batch_size=32, max_pending=None,
+                 seen_size=1 << 22, skip_plies=0, tt_size=1 << 16, weights=None, progress=None):
+    """
+    Analyses every distinct position of the games in paths and writes each result
+    to out as one JSON line as soon as its batch is done.
+
+    Parameters:
+    paths (list): Game files, see archive.read_games.
+    out (file): Text stream the JSON lines are written to.
+    depth (int): Search depth per position.
+    time_ms (float): Time limit per position, or None.
+    workers (int): Number of processes; None uses one per CPU.
+    batch_size (int): Positions sent to a worker at a time.
+    max_pending (int): Batches submitted but not written yet; reading waits while there
+                       are this many. None allows two per worker.
+    seen_size (int): Slots of the table of positions already analysed (8 bytes each).
+    skip_plies (int): Opening plies of each game left out.
+    tt_size (int): Transposition table buckets of each worker's AI_Algo.
+    weights (dict or str): Evaluation weights for AI_Algo.
+    progress (callable): Called as progress(positions written) after each batch.
+
+    Returns:
+    int: The number of positions analysed.
+    """
+    workers = workers or os.cpu_count()
+    max_pending = max_pending or 2 * workers
+    seen = SeenPositions(seen_size)
+    written = 0
+
+    def write(futures):
+        nonlocal written
+        for future in futures:
+            results = future.result()
+            for result in results:
+                out.write(json.dumps(result) + '\n')
+            written += len(results)
+        out.flush()
+        if progress is not None:
+            progress(written)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(tt_size, weights)) as pool:
+        pending = set()
+        for batch in batches(paths, seen, batch_size, skip_plies):
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)  # Backpressure
+                write(done)
+            pending.add(pool.submit(analyse_batch, batch, depth, time_ms))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            write(done)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analyse every position of a collection of games.')
+    parser.add_argument('games', nargs='+', help='match.py .jsonl, .pdn or game archive files')
+    parser.add_argument('--depth', type=int, default=6, help='search depth per position (default 6)')
+    parser.add_argument('--time-ms', type=float, help='time limit per position')
+    parser.add_argument('--weights', help='JSON file of evaluation weights')
+    parser.add_argument('--workers', type=int, help='worker processes (default one per CPU)')
+    parser.add_argument('--batch-size', type=int, default=32, help='positions per worker task (default 32)')
+    parser.add_argument('--max-pending', type=int, help='batches in flight (default two per worker)')
+    parser.add_argument('--seen-size', type=int, default=1 << 22,
+                        help='slots of the table of positions already analysed (default 4194304)')
+    parser.add_argument('--skip-plies', type=int, default=0, help='opening plies left out of each game (default 0)')
+    parser.add_argument('--output', default='-', help='JSON lines file to write (default stdout)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        count = run_analysis(args.games, out, args.depth, args.time_ms, args.workers, args.batch_size,
+                             args.max_pending, args.seen_size, args.skip_plies, weights=args.weights)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print('%d positions in %.1f s' % (count, time.perf_counter() - start), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
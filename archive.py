@@ -0,0 +1,255 @@
+"""
+Binary append-only game archive.
+
+An archive is two files. The data file (e.g. games.ckga) holds a header and
+then one record per game:
+
+    GAME header    moves length, tags length, result, packed start position (see notation.pack_position)
+    tags           JSON of the game's tags, often empty
+    moves          one byte per square of each move: its checkers.square_bit index,
+                   plus 128 on the last square of the move
+
+The index file (games.ckga.idx) holds the offset of every record as a 64-bit
+int, so game n is found without reading the games before it. Games are only
+ever appended; ArchiveWriter writes the record before its index entry, and on
+opening drops whatever a crash left after the last indexed game.
+
+A game of 100 plies takes about 230 bytes. Games are dicts as in notation.py.
+
+Usage: python archive.py add games.ckga results.jsonl games.pdn ...
+       python archive.py pdn games.ckga [--first N] [--count N]
+       python archive.py info games.ckga
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+
+from checkers import SQUARE_COORDS, square_bit
+from notation import START_FEN, from_fen, pack_position, read_pdn, to_fen, unpack_position, write_pdn
+
+MAGIC = b'CKGA'
+VERSION = 1
+HEADER = struct.Struct('<4sH')  # magic, version
+GAME = struct.Struct('<IHB13s')  # moves length, tags length, result, packed start position
+OFFSET = struct.Struct('<Q')
+RESULTS = (None, 'red', 'black', 'draw')
+LAST_SQUARE = 128  # Flag on the last square of a move
+
+
+def encode_moves(moves):
+    """Encodes move paths as bytes, see the module docstring."""
+    data = bytearray()
+    for move in moves:
+        for r, c in move:
+            data.append(square_bit(r, c).bit_length() - 1)
+        data[-1] |= LAST_SQUARE
+    return bytes(data)
+
+
+def decode_moves(data):
+    """Inverse of encode_moves."""
+    moves = []
+    move = []
+    for byte in data:
+        move.append(SQUARE_COORDS[byte & 31])
+        if byte & LAST_SQUARE:
+            moves.append(move)
+            move = []
+    return moves
+
+
+class ArchiveWriter:
+    """Appends games to an archive, creating it if needed. Use it as a context manager or close() it."""
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + '.idx'
+        self._data = open(path, 'a+b')
+        self._index = open(self.index_path, 'a+b')
+        self._data.seek(0)
+        header = self._data.read(HEADER.size)
+        if not header:
+            self._data.write(HEADER.pack(MAGIC, VERSION))
+        elif len(header) < HEADER.size or HEADER.unpack(header) != (MAGIC, VERSION):
+            self.close()
+            raise ValueError('%s is not a version %d game archive' % (path, VERSION))
+
+        # Keep only whole, indexed records: the last ones may be cut short by a crash
+        data_size = self._data.seek(0, os.SEEK_END)
+        self.count = self._index.seek(0, os.SEEK_END) // OFFSET.size
+        self._end = HEADER.size  # Where the next record goes
+        while self.count:
+            self._index.seek((self.count - 1) * OFFSET.size)
+            offset, = OFFSET.unpack(self._index.read(OFFSET.size))
+            self._data.seek(offset)
+            record = self._data.read(GAME.size)
+            if len(record) == GAME.size:
+                moves_length, tags_length, _, _ = GAME.unpack(record)
+                if offset + GAME.size + tags_length + moves_length <= data_size:
+                    self._end = offset + GAME.size + tags_length + moves_length
+                    break
+            self.count -= 1
+        self._index.truncate(self.count * OFFSET.size)
+        self._data.truncate(self._end)
+
+    def append(self, game):
+        """
+        Appends a game.
+
+        Parameters:
+        game (dict): The game, see notation.py. Keys other than fen, moves, result and tags are not stored.
+
+        Returns:
+        int: The number of the game in the archive.
+        """
+        board, player = from_fen(game.get('fen', START_FEN))
+        tags = json.dumps(game['tags'], separators=(',', ':')).encode() if game.get('tags') else b''
+        moves = encode_moves(game['moves'])
+        offset = self._end
+        self._data.write(GAME.pack(len(moves), len(tags), RESULTS.index(game.get('result')),
+                                   pack_position(board, player)))
+        self._data.write(tags)
+        self._data.write(moves)
+        self._index.write(OFFSET.pack(offset))
+        self._end += GAME.size + len(tags) + len(moves)
+        self.count += 1
+        return self.count - 1
+
+    def flush(self):
+        """Writes buffered games out; the index last, so that it only names complete games."""
+        self._data.flush()
+        self._index.flush()
+
+    def close(self):
+        self.flush()
+        self._data.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GameArchive:
+    """
+    Reads an archive. The files are memory-mapped, so only the games read are
+    paged in, and len(), archive[n] and iteration cost the same for any size.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = HEADER.unpack_from(self._data)
+        if magic != MAGIC or version != VERSION:
+            self._data.close()
+            raise ValueError('%s is not a version %d game archive' % (path, VERSION))
+        with open(path + '.idx', 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.count = size // OFFSET.size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, n):
+        """
+        Reads game n; negative numbers count from the end.
+
+        Returns:
+        dict: fen, moves, result and tags.
+        """
+        if n < 0:
+            n += self.count
+        if not 0 <= n < self.count:
+            raise IndexError('game %d not in archive' % n)
+        offset, = OFFSET.unpack_from(self._index, n * OFFSET.size)
+        moves_length, tags_length, result, position = GAME.unpack_from(self._data, offset)
+        start = offset + GAME.size
+        tags = json.loads(self._data[start:start + tags_length]) if tags_length else {}
+        start += tags_length
+        return {
+            'fen': to_fen(*unpack_position(position)),
+            'moves': decode_moves(self._data[start:start + moves_length]),
+            'result': RESULTS[result],
+            'tags': tags,
+        }
+
+    def __iter__(self):
+        return self.games()
+
+    def games(self, first=0, count=None):
+        """Yields count games (all the rest if None) starting with game first, one at a time."""
+        last = self.count if count is None else min(self.count, first + count)
+        for n in range(first, last):
+            yield self[n]
+
+    def close(self):
+        self._data.close()
+        if self._index:
+            self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_games(path):
+    """Yields the games of a match.py JSON lines file, a PDN file or an archive, one at a time."""
+    if path.endswith('.jsonl'):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield {'fen': record.get('fen', START_FEN), 'moves': record['moves'],
+                           'result': record.get('result'), 'tags': record.get('tags', {})}
+    elif path.endswith('.pdn'):
+        with open(path) as f:
+            yield from read_pdn(f)
+    else:
+        with GameArchive(path) as archive:
+            yield from archive
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build and read binary game archives.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    add_parser = commands.add_parser('add', help='append games to an archive')
+    add_parser.add_argument('archive', help='archive to append to (created if missing)')
+    add_parser.add_argument('inputs', nargs='+', help='match.py .jsonl, .pdn or archive files')
+    pdn_parser = commands.add_parser('pdn', help='print games as PDN')
+    pdn_parser.add_argument('archive')
+    pdn_parser.add_argument('--first', type=int, default=0, help='first game printed (default 0)')
+    pdn_parser.add_argument('--count', type=int, help='games printed (default all)')
+    info_parser = commands.add_parser('info', help='print the number of games and their size')
+    info_parser.add_argument('archive')
+    args = parser.parse_args()
+
+    if args.command == 'add':
+        with ArchiveWriter(args.archive) as writer:
+            added = 0
+            for path in args.inputs:
+                for game in read_games(path):
+                    writer.append(game)
+                    added += 1
+            print('%d games added, %d in archive' % (added, writer.count), file=sys.stderr)
+    elif args.command == 'pdn':
+        with GameArchive(args.archive) as archive:
+            for game in archive.games(args.first, args.count):
+                write_pdn(game, sys.stdout)
+    else:
+        with GameArchive(args.archive) as archive:
+            size = os.path.getsize(args.archive) + os.path.getsize(args.archive + '.idx')
+            print(json.dumps({'games': len(archive), 'bytes': size,
+                              'bytes_per_game': round(size / len(archive), 1) if len(archive) else None}))
+
+
+if __name__ == "__main__":
+    main()
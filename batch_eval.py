@@ -0,0 +1,172 @@
+"""
+Batch position evaluation with NumPy.
+
+Positions are rows of an (N, 32) int8 array with one column per playable square
+(numbered as in checkers.square_bit): 0 empty, 1 red man, 2 red king, -1 black
+man, -2 black king. evaluate_batch() scores every row at once with array
+operations, using the evaluate_checkers terms that need no per-piece Python:
+material, center control, edge safety, promotion potential, king safety, tempo
+and mobility. Vulnerability and clustering are left out. Scores are from Red's
+point of view.
+
+NumPy is only needed by this module; checkers.py and the UI run without it.
+"""
+import numpy as np
+
+from checkers import (DEFAULT_WEIGHTS, KING_DIRECTIONS, MAN_DIRECTIONS, NEIGHBOURS, PIECE_TERMS, BLACK_TERMS,
+                      TERM_MATERIAL, TERM_CENTER, TERM_EDGE, TERM_ADVANCED, TERM_KING_SAFETY)
+
+EMPTY, RED_MAN, RED_KING, BLACK_MAN, BLACK_KING = 0, 1, 2, -1, -2
+OFF_BOARD = 3  # Padding column that neighbour lookups off the board land on
+
+# Weight keys evaluate_batch computes
+BATCH_TERMS = ('material', 'center_control', 'edge_safety', 'promotion_potential', 'king_safety', 'tempo',
+               'mobility')
+
+SQUARES = np.arange(32)
+_CODE_KIND = {RED_MAN: 0, RED_KING: 1, BLACK_MAN: 2, BLACK_KING: 3}
+
+
+def _term_table(code):
+    """Running-sum terms (red terms, then black terms) of a piece with the given code on each square."""
+    kind = _CODE_KIND[code]
+    base = 0 if kind < 2 else BLACK_TERMS
+    table = np.zeros((32, 2 * BLACK_TERMS), dtype=np.float32)
+    for sq in range(32):
+        table[sq, base:base + BLACK_TERMS] = PIECE_TERMS[kind][sq]
+    return table
+
+
+def _neighbour_index(steps):
+    """For each direction and square, the square steps diagonal steps away, or 32 off the board."""
+    index = np.full((4, 32), 32)
+    for d in KING_DIRECTIONS:
+        for sq in range(32):
+            bit = 1 << sq
+            for _ in range(steps):
+                bit = NEIGHBOURS[bit.bit_length() - 1][d] if bit else 0
+            if bit:
+                index[d, sq] = bit.bit_length() - 1
+    return index
+
+
+TERM_TABLES = {code: _term_table(code) for code in _CODE_KIND}
+STEP_INDEX = _neighbour_index(1)
+JUMP_INDEX = _neighbour_index(2)
+
+
+def encode(positions):
+    """
+    Encodes positions for evaluate_batch.
+
+    Parameters:
+    positions (iterable): Board objects or Board.bitboards() (red, black, kings) tuples.
+
+    Returns:
+    numpy.ndarray: (N, 32) int8 array of piece codes.
+    """
+    bitboards = np.array([p.bitboards() if hasattr(p, 'bitboards') else p for p in positions],
+                         dtype=np.uint32).reshape(-1, 3)
+    bits = ((bitboards[:, :, None] >> SQUARES.astype(np.uint32)) & 1).astype(np.int8)
+    red, black, kings = bits[:, 0], bits[:, 1], bits[:, 2]
+    return (red - black) * (1 + kings)
+
+
+def _mobility(positions, neighbours, landings, colour):
+    """
+    evaluate_checkers' mobility of one side for every row; neighbours[d] and landings[d]
+    hold the codes one and two steps away in direction d.
+    """
+    sign = 1 if colour == 'R' else -1
+    men = positions == sign * RED_MAN
+    kings = positions == sign * RED_KING
+    side = men | kings
+
+    empty = []
+    jumps = []
+    jumpers = np.zeros(positions.shape, dtype=bool)
+    for d in KING_DIRECTIONS:
+        over = neighbours[d]
+        empty.append(over == EMPTY)
+        jumps.append(((over == -sign * RED_MAN) | (over == -sign * RED_KING)) & (landings[d] == EMPTY))
+        movers = side if d in MAN_DIRECTIONS[colour] else kings
+        jumpers |= movers & jumps[d]
+
+    # Single jumps for pieces that must capture, simple moves for the rest
+    man_moves = np.zeros(positions.shape, dtype=np.int8)
+    king_moves = np.zeros(positions.shape, dtype=np.int8)
+    for d in KING_DIRECTIONS:
+        open_squares = np.where(jumpers, jumps[d], empty[d])
+        if d in MAN_DIRECTIONS[colour]:
+            man_moves += open_squares
+        king_moves += open_squares
+    return (5 * (men * man_moves).sum(axis=1, dtype=np.int32) +
+            8 * (kings * king_moves).sum(axis=1, dtype=np.int32))
+
+
+def evaluate_batch(positions, weights=None):
+    """
+    Scores many positions at once.
+
+    Parameters:
+    positions (numpy.ndarray): (N, 32) int8 array of piece codes, see encode().
+    weights (dict): Evaluation weights; defaults to DEFAULT_WEIGHTS. Keys outside BATCH_TERMS are ignored.
+
+    Returns:
+    numpy.ndarray: N scores from Red's point of view.
+    """
+    return batch_terms(positions) @ _weight_vector(weights)
+
+
+def batch_terms(positions):
+    """
+    The unweighted BATCH_TERMS of every position.
+
+    Returns:
+    numpy.ndarray: (N, len(BATCH_TERMS)) array; evaluate_batch is its product with the weights.
+    """
+    positions = np.asarray(positions, dtype=np.int8)
+    terms = sum((positions == code).astype(np.float32) @ table for code, table in TERM_TABLES.items())
+    red, black = terms[:, :BLACK_TERMS], terms[:, BLACK_TERMS:]
+
+    # Codes of the squares one and two steps away in each direction
+    padded = np.concatenate([positions, np.full((len(positions), 1), OFF_BOARD, dtype=np.int8)], axis=1)
+    neighbours = [padded[:, STEP_INDEX[d]] for d in KING_DIRECTIONS]
+    landings = [padded[:, JUMP_INDEX[d]] for d in KING_DIRECTIONS]
+
+    return np.column_stack((
+        red[:, TERM_MATERIAL] - black[:, TERM_MATERIAL],
+        red[:, TERM_CENTER] - black[:, TERM_CENTER],
+        red[:, TERM_EDGE] - black[:, TERM_EDGE],
+        4 * (red[:, TERM_ADVANCED] - black[:, TERM_ADVANCED]),
+        red[:, TERM_KING_SAFETY] - black[:, TERM_KING_SAFETY],
+        red[:, TERM_ADVANCED] * 0.5,
+        _mobility(positions, neighbours, landings, 'R') - _mobility(positions, neighbours, landings, 'B'),
+    ))
+
+
+def _weight_vector(weights):
+    weights = DEFAULT_WEIGHTS if weights is None else weights
+    return np.array([weights.get(key, 0.0) for key in BATCH_TERMS])
+
+
+def evaluate_children(board, player, moves, weights=None):
+    """
+    Scores the position after each of moves in one evaluate_batch call, e.g. to order them.
+
+    Parameters:
+    board (Board): The position the moves are played from; left unchanged.
+    player (str): The side making the moves, 'R' or 'B'.
+    moves (list): Move paths.
+    weights (dict): Evaluation weights; defaults to DEFAULT_WEIGHTS.
+
+    Returns:
+    numpy.ndarray: One score per move, from player's point of view.
+    """
+    children = []
+    for move in moves:
+        board.make_move(move)
+        children.append(board.bitboards())
+        board.unmake_move()
+    scores = evaluate_batch(encode(children), weights)
+    return scores if player == 'R' else -scores
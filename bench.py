@@ -0,0 +1,179 @@
+"""
+Move generation and search benchmarks.
+
+perft counts the leaf nodes of the move tree to a given depth. The counts for
+the starting position are known (PERFT_START), so they check any change to
+move generation or to the board representation.
+
+bench runs best_move over a fixed corpus of midgame and endgame positions and
+reports nodes/sec, time to each depth and evaluation throughput as JSON, for
+comparing one version against another.
+
+Usage: python bench.py perft [--depth 7] [--divide]
+       python bench.py bench [--depth 6] [--workers N] [--output bench.json]
+"""
+import argparse
+import json
+import sys
+import time
+
+from checkers import AI_Algo, Board
+
+# Leaf nodes of the starting position with Red to move, by depth
+PERFT_START = (1, 7, 49, 302, 1469, 7361, 36768, 179740, 845931)
+
+# Red-to-move positions as Board.bitboards() (red, black, kings)
+CORPUS = (
+    ('midgame-1', (0x00008C37, 0xB88A2000, 0x00000000)),
+    ('midgame-2', (0x0010071D, 0xB1860000, 0x00000000)),
+    ('midgame-3', (0x00123605, 0x354C0000, 0x00000000)),
+    ('midgame-4', (0x000014D9, 0xF04A0000, 0x00000000)),
+    ('midgame-5', (0x00480931, 0xD4063080, 0x00000000)),
+    ('midgame-6', (0x081000BB, 0xF1002000, 0x00000000)),
+    ('endgame-1', (0x00420020, 0x80001504, 0x00020004)),
+    ('endgame-2', (0x02000406, 0x00102001, 0x02000001)),
+    ('endgame-3', (0xC0020000, 0x00004602, 0xC0000402)),
+    ('endgame-4', (0x20000000, 0x00002E09, 0x20000209)),
+)
+
+EVAL_REPEATS = 2000  # evaluate_checkers calls timed per corpus position
+
+
+def perft(board, player, depth):
+    """Counts the positions reached after depth plies of legal moves from board."""
+    if depth == 0:
+        return 1
+    moves = board.get_legal_moves(player)
+    if depth == 1:
+        return len(moves)
+    opponent = 'B' if player == 'R' else 'R'
+    nodes = 0
+    for move in moves:
+        board.make_move(move)
+        nodes += perft(board, opponent, depth - 1)
+        board.unmake_move()
+    return nodes
+
+
+def divide(board, player, depth):
+    """perft split by root move: a list of (move, leaf nodes) pairs."""
+    opponent = 'B' if player == 'R' else 'R'
+    counts = []
+    for move in board.get_legal_moves(player):
+        board.make_move(move)
+        counts.append((move, perft(board, opponent, depth - 1)))
+        board.unmake_move()
+    return counts
+
+
+def run_perft(depth, show_divide=False, out=sys.stdout):
+    """
+    Runs perft on the starting position for every depth up to depth and writes
+    one JSON line per depth.
+
+    Returns:
+    bool: True if every count matches PERFT_START.
+    """
+    board = Board()
+    ok = True
+    for d in range(1, depth + 1):
+        start = time.perf_counter()
+        nodes = perft(board, 'R', d)
+        elapsed = time.perf_counter() - start
+        expected = PERFT_START[d] if d < len(PERFT_START) else None
+        ok = ok and expected in (None, nodes)
+        out.write(json.dumps({
+            'depth': d,
+            'nodes': nodes,
+            'expected': expected,
+            'elapsed_ms': round(elapsed * 1000, 3),
+            'nodes_per_sec': round(nodes / elapsed) if elapsed else None,
+        }) + '\n')
+    if show_divide:
+        for move, nodes in divide(board, 'R', depth):
+            out.write(json.dumps({'move': move, 'nodes': nodes}) + '\n')
+    return ok
+
+
+def run_bench(depth, workers=None):
+    """
+    Searches every corpus position to depth with a fresh AI_Algo.
+
+    Returns:
+    dict: Per-position and total nodes, elapsed_ms, nodes_per_sec, time to each
+    depth and evaluations per second.
+    """
+    positions = []
+    total_nodes = total_elapsed = total_evals = total_eval_time = 0
+    for name, position in CORPUS:
+        board = Board()
+        board.load_bitboards(*position)
+        ai = AI_Algo(board, workers=workers)
+        try:
+            start = time.perf_counter()
+            move, iterations = ai.best_move(max_depth=depth, return_stats=True)
+            elapsed = time.perf_counter() - start
+        finally:
+            ai.close()
+        nodes = sum(it['nodes'] + it['quiescence_nodes'] for it in iterations)
+
+        start = time.perf_counter()
+        for _ in range(EVAL_REPEATS):
+            ai.evaluate_checkers('R')
+        eval_time = time.perf_counter() - start
+
+        positions.append({
+            'name': name,
+            'move': move,
+            'score': iterations[-1]['score'] if iterations else None,
+            'nodes': nodes,
+            'elapsed_ms': round(elapsed * 1000, 3),
+            'nodes_per_sec': round(nodes / elapsed) if elapsed else None,
+            'time_to_depth_ms': {it['depth']: round(it['elapsed_ms'], 3) for it in iterations},
+            'evals_per_sec': round(EVAL_REPEATS / eval_time),
+        })
+        total_nodes += nodes
+        total_elapsed += elapsed
+        total_evals += EVAL_REPEATS
+        total_eval_time += eval_time
+
+    return {
+        'depth': depth,
+        'workers': workers,
+        'positions': positions,
+        'total': {
+            'nodes': total_nodes,
+            'elapsed_ms': round(total_elapsed * 1000, 3),
+            'nodes_per_sec': round(total_nodes / total_elapsed) if total_elapsed else None,
+            'evals_per_sec': round(total_evals / total_eval_time),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Move generation and search benchmarks.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    perft_parser = commands.add_parser('perft', help='count leaf nodes from the starting position')
+    perft_parser.add_argument('--depth', type=int, default=7, help='deepest depth counted (default 7)')
+    perft_parser.add_argument('--divide', action='store_true', help='also print the count of each root move')
+    bench_parser = commands.add_parser('bench', help='time best_move over the position corpus')
+    bench_parser.add_argument('--depth', type=int, default=6, help='search depth (default 6)')
+    bench_parser.add_argument('--workers', type=int, help='worker processes for the root search')
+    bench_parser.add_argument('--output', default='-', help='JSON file to write (default stdout)')
+    args = parser.parse_args()
+
+    if args.command == 'perft':
+        if not run_perft(args.depth, args.divide):
+            sys.exit('perft counts do not match the reference counts')
+        return
+
+    report = json.dumps(run_bench(args.depth, args.workers), indent=2)
+    if args.output == '-':
+        print(report)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,11 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from enum import Enum
 import copy
+import json
+import multiprocessing
+import random
+import threading
+import time
 
 class Status(Enum):
     INVALID_MOVE = 'Invalid Move'
@@ -8,48 +14,463 @@ class Status(Enum):
     CAPTURE_AGAIN = 'Capture Again'
     WAS_CAPTURE_MOVE = 'Was Capture Move'
 
+# Bitboard layout
+# ---------------
+# Only the 32 dark squares are playable, so a position is held in three ints:
+# the red pieces, the black pieces, and the kings among them. Squares are
+# numbered 0..31 in raster order, four per row, so square s is on row s // 4.
+# Even rows use the odd columns and odd rows use the even columns.
+FULL_BOARD = (1 << 32) - 1
+ROWS = [0xF << (4 * r) for r in range(8)]
+EVEN_ROWS = ROWS[0] | ROWS[2] | ROWS[4] | ROWS[6]
+ODD_ROWS = FULL_BOARD ^ EVEN_ROWS
+LEFT_EDGE = (1 << 4) | (1 << 12) | (1 << 20) | (1 << 28)    # column 0
+RIGHT_EDGE = (1 << 3) | (1 << 11) | (1 << 19) | (1 << 27)   # column 7
+BACK_ROWS = ROWS[0] | ROWS[7]
+EDGE_SQUARES = LEFT_EDGE | RIGHT_EDGE | BACK_ROWS
+CENTER_SQUARES = 0  # rows 2-5, columns 2-5
+for _r in range(2, 6):
+    for _c in range(2, 6):
+        if (_r + _c) % 2 == 1:
+            CENTER_SQUARES |= 1 << (_r * 4 + _c // 2)
+
+# Diagonal directions, in the same order as the (dr, dc) direction lists
+UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT = range(4)
+KING_DIRECTIONS = (UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT)
+MAN_DIRECTIONS = {'B': (UP_LEFT, UP_RIGHT), 'R': (DOWN_LEFT, DOWN_RIGHT)}  # B=up, R=down
+OPPOSITE = (DOWN_RIGHT, DOWN_LEFT, UP_RIGHT, UP_LEFT)
+DIRECTION_OF = {(-1, -1): UP_LEFT, (-1, 1): UP_RIGHT, (1, -1): DOWN_LEFT, (1, 1): DOWN_RIGHT}
+
+# Source squares that stay on the board for each shift
+_UL_EVEN, _UL_ODD = EVEN_ROWS & ~ROWS[0], ODD_ROWS & ~LEFT_EDGE
+_UR_EVEN, _UR_ODD = EVEN_ROWS & ~ROWS[0] & ~RIGHT_EDGE, ODD_ROWS
+_DL_EVEN, _DL_ODD = EVEN_ROWS, ODD_ROWS & ~LEFT_EDGE & ~ROWS[7]
+_DR_EVEN, _DR_ODD = EVEN_ROWS & ~RIGHT_EDGE, ODD_ROWS & ~ROWS[7]
+
+
+def _step_up_left(bb):
+    return (bb & _UL_EVEN) >> 4 | (bb & _UL_ODD) >> 5
+
+
+def _step_up_right(bb):
+    return (bb & _UR_EVEN) >> 3 | (bb & _UR_ODD) >> 4
+
+
+def _step_down_left(bb):
+    return (bb & _DL_EVEN) << 4 | (bb & _DL_ODD) << 3
+
+
+def _step_down_right(bb):
+    return (bb & _DR_EVEN) << 5 | (bb & _DR_ODD) << 4
+
+
+# STEP[d](bb) moves every square in bb one diagonal step in direction d
+STEP = (_step_up_left, _step_up_right, _step_down_left, _step_down_right)
+
+
+def step(bb, direction):
+    """Moves every square in bb one diagonal step; squares that would leave the board are dropped."""
+    return STEP[direction](bb)
+
+
+def neighbours(bb):
+    """Returns step(bb, d) for each of the four directions, in KING_DIRECTIONS order."""
+    return (
+        (bb & _UL_EVEN) >> 4 | (bb & _UL_ODD) >> 5,
+        (bb & _UR_EVEN) >> 3 | (bb & _UR_ODD) >> 4,
+        (bb & _DL_EVEN) << 4 | (bb & _DL_ODD) << 3,
+        (bb & _DR_EVEN) << 5 | (bb & _DR_ODD) << 4,
+    )
+
+
+def square_bit(r, c):
+    """Returns the bitboard bit for (r, c), or 0 for a light or off-board square."""
+    if 0 <= r < 8 and 0 <= c < 8 and (r + c) % 2 == 1:
+        return 1 << (r * 4 + c // 2)
+    return 0
+
+
+def square_coords(sq):
+    """Returns the (row, col) of bitboard square sq."""
+    r = sq >> 2
+    return (r, (sq & 3) * 2 + 1 - (r & 1))
+
+
+SQUARE_COORDS = [square_coords(sq) for sq in range(32)]
+
+
+def bit_coords(bit):
+    """Returns the (row, col) of a single-bit bitboard."""
+    return SQUARE_COORDS[bit.bit_length() - 1]
+
+
+# Per-square lookup tables shared by the move generators and the evaluator.
+# Piece kinds are 0 = red man, 1 = red king, 2 = black man, 3 = black king
+# (the Zobrist kinds); kings of either colour move alike.
+KIND_BASE = {'R': 0, 'B': 2}
+KIND_DIRECTIONS = (MAN_DIRECTIONS['R'], KING_DIRECTIONS, MAN_DIRECTIONS['B'], KING_DIRECTIONS)
+PROMOTION_ROW = (ROWS[7], 0, ROWS[0], 0)  # Crowning row of each kind; kings have none
+
+# NEIGHBOURS[sq][d] is the bit one step from sq in direction d, or 0 off the board
+NEIGHBOURS = [tuple(STEP[d](1 << sq) for d in KING_DIRECTIONS) for sq in range(32)]
+
+
+def _targets(kind, sq):
+    steps = []
+    jumps = []
+    for d in KIND_DIRECTIONS[kind]:
+        near = NEIGHBOURS[sq][d]
+        if near:
+            near_sq = near.bit_length() - 1
+            steps.append((near, near_sq))
+            far = NEIGHBOURS[near_sq][d]
+            if far:
+                jumps.append((near, far, far.bit_length() - 1))
+    return tuple(steps), tuple(jumps)
+
+
+# STEP_TARGETS[kind][sq]: (target bit, target square) of each simple move
+# JUMP_TARGETS[kind][sq]: (jumped bit, landing bit, landing square) of each jump
+STEP_TARGETS = [[_targets(kind, sq)[0] for sq in range(32)] for kind in range(4)]
+JUMP_TARGETS = [[_targets(kind, sq)[1] for sq in range(32)] for kind in range(4)]
+
+
+# Zobrist keys: ZOBRIST[kind][sq] for kind 0 = red man, 1 = red king, 2 = black man,
+# 3 = black king. The seed is fixed so every process hashes positions the same way.
+_zobrist_rng = random.Random(0x5EED)
+ZOBRIST = [[_zobrist_rng.getrandbits(64) for _ in range(32)] for _ in range(4)]
+ZOBRIST_BLACK_TO_MOVE = _zobrist_rng.getrandbits(64)
+
+
+# Static evaluation terms that Board keeps as running sums. Board.terms holds
+# them for red at offsets 0..4 and for black at offsets 5..9.
+PAWN_VALUE = 100
+KING_VALUE = 160
+TERM_MATERIAL, TERM_CENTER, TERM_EDGE, TERM_ADVANCED, TERM_KING_SAFETY = range(5)
+BLACK_TERMS = 5
+
+
+def _piece_terms(kind, sq):
+    """Contribution of one piece of the given Zobrist kind on sq to each running term."""
+    bit = 1 << sq
+    row = sq >> 2
+    is_king = kind in (1, 3)
+    return (
+        KING_VALUE if is_king else PAWN_VALUE,
+        (12 if is_king else 8) if bit & CENTER_SQUARES else 0,
+        6 if bit & EDGE_SQUARES else 0,
+        0 if is_king else (row if kind == 0 else 7 - row),  # Rows advanced towards crowning
+        15 if is_king and bit & BACK_ROWS else 0,
+    )
+
+
+PIECE_TERMS = [[_piece_terms(kind, sq) for sq in range(32)] for kind in range(4)]
+
+
+def position_key(board, player):
+    """Zobrist key of the board with player ('R' or 'B') to move."""
+    return board.hash ^ ZOBRIST_BLACK_TO_MOVE if player == 'B' else board.hash
+
+
+def _reverse32(bb):
+    return int(format(bb, '032b')[::-1], 2)
+
+
+def flip(red, black, kings):
+    """
+    Turns the board around and swaps the colours, so that Black's position
+    becomes a Red position for AI_Algo (which always plays Red).
+    Square sq maps to 31 - sq, i.e. (r, c) to (7 - r, 7 - c).
+    """
+    return _reverse32(black), _reverse32(red), _reverse32(kings)
+
+
+def flip_move(move):
+    """Maps a move path between the flipped and the real board (see flip)."""
+    return [(7 - r, 7 - c) for r, c in move]
+
+
+class _BoardRow:
+    """One row of Board.board; reads and writes go straight to the bitboards."""
+    __slots__ = ('_board', '_row')
+
+    def __init__(self, board, row):
+        self._board = board
+        self._row = row
+
+    def __getitem__(self, col):
+        return self._board.piece_at(self._row, col)
+
+    def __setitem__(self, col, piece):
+        self._board.set_piece(self._row, col, piece)
+
+    def __len__(self):
+        return 8
+
+    def __iter__(self):
+        return (self._board.piece_at(self._row, c) for c in range(8))
+
+
+class _BoardGrid:
+    """8x8 view of a Board using the 'R', 'RK', 'B', 'BK', 'X' and '_' codes."""
+    __slots__ = ('_board',)
+
+    def __init__(self, board):
+        self._board = board
+
+    def __getitem__(self, row):
+        if not 0 <= row < 8:
+            raise IndexError('row off the board')
+        return _BoardRow(self._board, row)
+
+    def __len__(self):
+        return 8
+
+    def __iter__(self):
+        return (_BoardRow(self._board, r) for r in range(8))
+
+
 class Board:
     def __init__(self):
         self.reset()
 
     def reset(self):
-        self.board = [['_'] * 8 for _ in range(8)]
-    
-        for row in range(8):
-            for col in range(8):
-                if (row + col) % 2 == 1:  # Black squares
-                    if row < 3:
-                        self.board[row][col] = 'R'  # Red pieces
-                    elif row > 4:
-                        self.board[row][col] = 'B'  # Black pieces
-                    else:
-                        self.board[row][col] = 'X'  # Empty black square
+        self.load_bitboards(ROWS[0] | ROWS[1] | ROWS[2],   # Red pieces
+                            ROWS[5] | ROWS[6] | ROWS[7],   # Black pieces
+                            0)
+
+    def bitboards(self):
+        """Returns the position as a compact (red, black, kings) tuple of ints."""
+        return (self.red, self.black, self.kings)
+
+    def load_bitboards(self, red, black, kings):
+        """Sets the position from a (red, black, kings) tuple as returned by bitboards()."""
+        self.red, self.black, self.kings = red, black, kings
+        self.hash = self.compute_hash()  # Zobrist hash, kept up to date by every mutation
+        self.terms = self.compute_terms()  # Running evaluation sums, see PIECE_TERMS
+        self.undo_stack = []  # One entry per make_move, popped by unmake_move
+
+    def copy(self):
+        clone = self.__class__.__new__(self.__class__)
+        clone.red, clone.black, clone.kings = self.red, self.black, self.kings
+        clone.hash = self.hash
+        clone.terms = self.terms[:]
+        clone.undo_stack = list(self.undo_stack)
+        return clone
+
+    def compute_hash(self):
+        """Computes the Zobrist hash of the position from scratch."""
+        h = 0
+        for kind, pieces in enumerate(self._piece_sets()):
+            while pieces:
+                bit = pieces & -pieces
+                pieces ^= bit
+                h ^= ZOBRIST[kind][bit.bit_length() - 1]
+        return h
+
+    def compute_terms(self):
+        """Computes the running evaluation sums of the position from scratch."""
+        terms = [0] * (2 * BLACK_TERMS)
+        for kind, pieces in enumerate(self._piece_sets()):
+            base = 0 if kind < 2 else BLACK_TERMS
+            while pieces:
+                bit = pieces & -pieces
+                pieces ^= bit
+                for i, value in enumerate(PIECE_TERMS[kind][bit.bit_length() - 1], base):
+                    terms[i] += value
+        return terms
+
+    def _add_terms(self, kind, sq, sign):
+        """Adds (sign=1) or removes (sign=-1) one piece's share of the running evaluation sums."""
+        terms = self.terms
+        for i, value in enumerate(PIECE_TERMS[kind][sq], 0 if kind < 2 else BLACK_TERMS):
+            terms[i] += sign * value
+
+    def _piece_sets(self):
+        """Bitboards of red men, red kings, black men and black kings (the Zobrist kinds)."""
+        return (self.red & ~self.kings, self.red & self.kings,
+                self.black & ~self.kings, self.black & self.kings)
+
+    def _kind(self, bit):
+        """Zobrist kind of the piece standing on bit."""
+        return (0 if self.red & bit else 2) + (1 if self.kings & bit else 0)
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    @property
+    def board(self):
+        """The position as an 8x8 grid of piece codes, backed by the bitboards."""
+        return _BoardGrid(self)
+
+    @board.setter
+    def board(self, grid):
+        self.red = self.black = self.kings = self.hash = 0
+        self.terms = [0] * (2 * BLACK_TERMS)
+        self.undo_stack = []
+        for r, row in enumerate(grid):
+            for c, piece in enumerate(row):
+                if (r + c) % 2 == 1:
+                    self.set_piece(r, c, piece)
 
     def __str__(self):
         return '\n'.join(' '.join(row) for row in self.board)
-    
+
+    def piece_at(self, r, c):
+        """Returns the piece code at (r, c): 'R', 'RK', 'B', 'BK', 'X' (empty) or '_' (light square)."""
+        if not (0 <= r < 8 and 0 <= c < 8):
+            raise IndexError('square off the board')
+        bit = square_bit(r, c)
+        if not bit:
+            return '_'
+        if self.red & bit:
+            return 'RK' if self.kings & bit else 'R'
+        if self.black & bit:
+            return 'BK' if self.kings & bit else 'B'
+        return 'X'
+
+    def set_piece(self, r, c, piece):
+        """Places a piece code at (r, c); 'X' empties the square."""
+        bit = square_bit(r, c)
+        if not bit:
+            if piece == '_':
+                return
+            raise ValueError('pieces can only stand on dark squares')
+        self._remove(bit)
+        if piece in ('R', 'RK'):
+            self.red |= bit
+        elif piece in ('B', 'BK'):
+            self.black |= bit
+        else:
+            return
+        if piece in ('RK', 'BK'):
+            self.kings |= bit
+        kind, sq = self._kind(bit), bit.bit_length() - 1
+        self.hash ^= ZOBRIST[kind][sq]
+        self._add_terms(kind, sq, 1)
+
+    def pieces(self, player):
+        """Returns (player's pieces, opponent's pieces) as bitboards."""
+        return (self.black, self.red) if player == 'B' else (self.red, self.black)
+
+    def empty_squares(self):
+        return FULL_BOARD & ~(self.red | self.black)
+
+    def _relocate(self, start, end):
+        """Moves whatever stands on bit start to bit end."""
+        if start == end:
+            return  # A king's multi-jump can finish where it started
+        kind = self._kind(start)
+        from_sq, to_sq = start.bit_length() - 1, end.bit_length() - 1
+        self.hash ^= ZOBRIST[kind][from_sq] ^ ZOBRIST[kind][to_sq]
+        self._add_terms(kind, from_sq, -1)
+        self._add_terms(kind, to_sq, 1)
+        if self.red & start:
+            self.red ^= start | end
+        else:
+            self.black ^= start | end
+        if self.kings & start:
+            self.kings ^= start | end
+
+    def _remove(self, bits):
+        """Clears every square in bits."""
+        occupied = bits & (self.red | self.black)
+        while occupied:
+            bit = occupied & -occupied
+            occupied ^= bit
+            kind, sq = self._kind(bit), bit.bit_length() - 1
+            self.hash ^= ZOBRIST[kind][sq]
+            self._add_terms(kind, sq, -1)
+        self.red &= ~bits
+        self.black &= ~bits
+        self.kings &= ~bits
+
+    def _crown(self, bit):
+        """Turns the man on bit into a king."""
+        sq = bit.bit_length() - 1
+        kind = self._kind(bit)
+        self.hash ^= ZOBRIST[kind][sq] ^ ZOBRIST[kind + 1][sq]
+        self._add_terms(kind, sq, -1)
+        self._add_terms(kind + 1, sq, 1)
+        self.kings |= bit
+
+    def make_move(self, move):
+        """
+        Plays a move given as a list of squares [(start_r, start_c), ..., (end_r, end_c)]
+        and pushes what is needed to take it back onto the undo stack.
+        Every two-square hop along the path captures the piece it jumps over, and a man
+        ending the move on the farthest row is promoted. The move is not validated.
+        """
+        start_pos, end_pos = move[0], move[-1]
+        start = square_bit(*start_pos)
+        end = square_bit(*end_pos)
+        previous_hash = self.hash
+        previous_terms = tuple(self.terms)  # Immutable, so copies of the board can share the undo stack
+
+        # Remove jumped pieces, remembering which of them were kings
+        captured = 0
+        for (from_r, from_c), (to_r, to_c) in zip(move, move[1:]):
+            if abs(to_r - from_r) == 2:
+                captured |= square_bit((from_r + to_r) // 2, (from_c + to_c) // 2)
+        captured_kings = self.kings & captured
+        if captured:
+            self._remove(captured)
+
+        self._relocate(start, end)
+
+        # Handle King Promotion
+        promoted = False
+        if not self.kings & end:
+            if (self.red & end and end_pos[0] == 7) or (self.black & end and end_pos[0] == 0):
+                self._crown(end)
+                promoted = True
+
+        self.undo_stack.append((start, end, captured, captured_kings, promoted, previous_hash, previous_terms))
+
+    def unmake_move(self):
+        """Takes back the most recent make_move, restoring captured pieces and undoing promotion."""
+        start, end, captured, captured_kings, promoted, self.hash, previous_terms = self.undo_stack.pop()
+        self.terms = list(previous_terms)
+        if promoted:
+            self.kings &= ~end
+        if start != end:
+            moved = start | end
+            if self.red & end:
+                self.red ^= moved
+            else:
+                self.black ^= moved
+            if self.kings & end:
+                self.kings ^= moved
+        if captured:
+            if self.red & start:
+                self.black |= captured
+            else:
+                self.red |= captured
+            self.kings |= captured_kings
+
     def is_king(self, r, c):
-        return self.board[r][c] in ('BK','RK')
+        return bool(self.kings & square_bit(r, c))
 
     def move_piece(self, start_pos, end_pos, player):
         start_r, start_c = start_pos  # Now matches user_input's (col, row)
         end_r, end_c = end_pos
+        start = square_bit(start_r, start_c)
+        end = square_bit(end_r, end_c)
 
         # Check if starting cell has the correct piece
-        valid_pieces = ('B','BK') if player=='B' else ('R','RK')
-
-        if self.board[start_r][start_c] not in valid_pieces:
+        own, _ = self.pieces(player)
+        if not own & start:
             return Status.INVALID_MOVE
-        
+
         # Check if destination is empty
-        if self.board[end_r][end_c] != 'X':
+        if not self.empty_squares() & end:
             return Status.INVALID_MOVE
 
-        dr = end_r - start_r  
-        dc = end_c - start_c 
+        dr = end_r - start_r
+        dc = end_c - start_c
 
         # Check move direction (regular pieces can only move forward)
-        if not self.is_king(start_r, start_c):
+        if not self.kings & start:
             if (player == 'B' and dr >= 0) or (player == 'R' and dr <= 0): # Direction check (B=up, R=down)
                 return Status.INVALID_MOVE  # Wrong direction
 
@@ -59,39 +480,36 @@ class Board:
             if self.has_available_captures(player): # Cannot force AI for capture
                 return Status.CAPTURE_FIRST  # Must capture instead
 
-            self.board[end_r][end_c] = self.board[start_r][start_c]
-            self.board[start_r][start_c] = 'X'
+            self._relocate(start, end)
             self.check_promotion(end_r, end_c)  # Promote to king if needed
             return Status.VALID_MOVE
-        
+
         # Capture move (jump over opponent)
+        was_king = self.kings & start
         if abs(dr) == 2 and abs(dc) == 2 and self.capture_move(start_pos, end_pos, player):
-            # Check for Multi-Jump
-            if self._can_capture_from_position(end_r, end_c, player):
+            # Check for Multi-Jump; a man that was just crowned ends its move, as in get_legal_moves
+            crowned = not was_king and self.kings & end
+            if not crowned and self._can_capture_from_position(end_r, end_c, player):
                 return Status.CAPTURE_AGAIN
-        
+
             return Status.WAS_CAPTURE_MOVE
 
         return Status.INVALID_MOVE
-    
+
     def capture_move(self, start_pos, end_pos, player):
         start_r, start_c = start_pos
         end_r, end_c = end_pos
 
-        mid_r = (start_r + end_r) // 2
-        mid_c = (start_c + end_c) // 2
-        
-        # Determine the opponent's piece
-        opponent_pieces = ('R','RK') if player=='B' else ('B','BK')
+        mid = square_bit((start_r + end_r) // 2, (start_c + end_c) // 2)
 
         # Check if middle piece is opponent
-        if self.board[mid_r][mid_c] not in opponent_pieces:
+        _, opp = self.pieces(player)
+        if not opp & mid:
             return False
 
         # Perform the capture
-        self.board[end_r][end_c] = self.board[start_r][start_c]
-        self.board[start_r][start_c] = 'X'
-        self.board[mid_r][mid_c] = 'X'
+        self._relocate(square_bit(start_r, start_c), square_bit(end_r, end_c))
+        self._remove(mid)
         self.check_promotion(end_r, end_c)  # Promote to king if needed
         return True
 
@@ -100,45 +518,35 @@ class Board:
         Check if the specified player has any available captures.
         Returns True if at least one capture exists, False otherwise.
         """
-        for r in range(len(self.board)):
-            for c in range(len(self.board[r])):
-                   
-                # Skip if the piece doesn't belong to the player
-                valid_pieces = ('B','BK') if player=='B' else ('R','RK')
-
-                if self.board[r][c] not in valid_pieces:
-                    continue
-                
-                # Check all possible capture directions
-                if self._can_capture_from_position(r, c, player):
-                    return True
-        return False
+        return bool(self.jumpers(player))
+
+    def jumpers(self, player):
+        """Returns a bitboard of the player's pieces that have a capture available."""
+        own, opp = self.pieces(player)
+        empty = FULL_BOARD & ~(own | opp)
+        kings = own & self.kings
+        man_directions = MAN_DIRECTIONS[player]
+        jumpers = 0
+        for d in KING_DIRECTIONS:
+            back = OPPOSITE[d]
+            movers = own if d in man_directions else kings
+            jumpers |= movers & STEP[back](STEP[back](empty) & opp)
+        return jumpers
 
     def _can_capture_from_position(self, r, c, player):
         """Helper to check if a piece at (r,c) can capture any opponent."""
+        bit = square_bit(r, c)
+        if not bit:
+            return False
+        _, opp = self.pieces(player)
+        empty = self.empty_squares()
 
-        # Define movement directions based on piece type
-        king_directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-        directions = king_directions if self.is_king(r,c) else (
-            [(-1, -1), (-1, 1)] if player == 'B' else [(1, -1), (1, 1)]
-        )
-        
-        # Check each direction for a valid capture
-        for dr, dc in directions:
-            jump_r, jump_c = r + dr, c + dc
-            land_r, land_c = r + 2*dr, c + 2*dc
-            
-            # Check bounds
-            if not (0 <= land_r < len(self.board) and 0 <= land_c < len(self.board[land_r])):
-                continue
-
-            # Determine the opponent's piece
-            opponent_pieces = ('R','RK') if player=='B' else ('B','BK')
-
-            # Check if jump is over an opponent and landing is empty
-            if (self.board[jump_r][jump_c] in opponent_pieces and self.board[land_r][land_c] == 'X'):
+        # Check each jump for the piece type over an opponent onto an empty square
+        kind = KIND_BASE[player] + (1 if self.kings & bit else 0)
+        for mid, land, _ in JUMP_TARGETS[kind][bit.bit_length() - 1]:
+            if mid & opp and land & empty:
                 return True
-            
+
         return False
 
     def get_valid_moves(self, r, c):
@@ -146,82 +554,445 @@ class Board:
         Format: { (dest_r, dest_c): [(captured_r, captured_c)] }
         If move is not a capture, the list is empty.
         """
-        piece = self.board[r][c]
-        if piece not in ('B', 'R', 'BK', 'RK'):
+        bit = square_bit(r, c)
+        if not bit & (self.red | self.black):
             return {}
 
-        player = 'B' if piece.startswith('B') else 'R'
-        is_king = self.is_king(r, c)
+        player = 'B' if self.black & bit else 'R'
+        _, opp = self.pieces(player)
+        empty = self.empty_squares()
+        kind = self._kind(bit)
+        sq = bit.bit_length() - 1
 
+        # Capture moves
         moves = {}
-        directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)] if is_king else (
-            [(-1, -1), (-1, 1)] if player == 'B' else [(1, -1), (1, 1)]
-        )
+        for mid, land, land_sq in JUMP_TARGETS[kind][sq]:
+            if mid & opp and land & empty:
+                moves[SQUARE_COORDS[land_sq]] = [bit_coords(mid)]
 
-        opponent_pieces = ('R', 'RK') if player == 'B' else ('B', 'BK')
+        # Enforce capture rule: only return capture moves if any exist
+        if moves:
+            return moves
 
-        for dr, dc in directions:
-            # Simple move
-            new_r, new_c = r + dr, c + dc
-            if 0 <= new_r < 8 and 0 <= new_c < 8 and self.board[new_r][new_c] == 'X':
-                # Only add if no captures are available (will be filtered later)
-                moves[(new_r, new_c)] = []
-
-            # Capture move
-            mid_r, mid_c = r + dr, c + dc
-            jump_r, jump_c = r + 2 * dr, c + 2 * dc
-            if (
-                0 <= jump_r < 8 and 0 <= jump_c < 8 and
-                self.board[mid_r][mid_c] in opponent_pieces and
-                self.board[jump_r][jump_c] == 'X'
-            ):
-                moves[(jump_r, jump_c)] = [(mid_r, mid_c)]
+        # Simple moves
+        for target, target_sq in STEP_TARGETS[kind][sq]:
+            if target & empty:
+                moves[SQUARE_COORDS[target_sq]] = []
+        return moves
 
-        # Enforce capture rule: only return capture moves if any exist
-        capture_moves = {k: v for k, v in moves.items() if v}
-        return capture_moves if capture_moves else moves
+    def get_legal_moves(self, player):
+        """
+        Returns every legal move for player ('R' or 'B') as a path [(r, c), ..., (r, c)].
+        Captures are compulsory across the whole board and a capturing piece keeps
+        jumping while it can, so a multi-jump is a single move listing every landing
+        square. A man that reaches the crowning row ends its move there.
+        """
+        own, opp = self.pieces(player)
+        empty = FULL_BOARD & ~(own | opp)
+        kind_base = KIND_BASE[player]
+        moves = []
+
+        jumpers = self.jumpers(player)
+        if jumpers:
+            while jumpers:
+                bit = jumpers & -jumpers
+                jumpers ^= bit
+                kind = kind_base + (1 if self.kings & bit else 0)
+                # The moving piece leaves its square, so a king may pass back over it
+                self._add_jump_paths([bit_coords(bit)], bit.bit_length() - 1, JUMP_TARGETS[kind],
+                                     PROMOTION_ROW[kind], opp, empty | bit, moves)
+            return moves
+
+        pieces = own
+        while pieces:
+            bit = pieces & -pieces
+            pieces ^= bit
+            sq = bit.bit_length() - 1
+            start = SQUARE_COORDS[sq]
+            for target, target_sq in STEP_TARGETS[kind_base + (1 if self.kings & bit else 0)][sq]:
+                if target & empty:
+                    moves.append([start, SQUARE_COORDS[target_sq]])
+        return moves
+
+    def _add_jump_paths(self, path, sq, jumps, crown_row, opp, empty, moves):
+        """Extends a capture path from sq by every possible jump, appending finished paths to moves."""
+        for mid, land, land_sq in jumps[sq]:
+            if mid & opp and land & empty:
+                next_path = path + [SQUARE_COORDS[land_sq]]
+                if land & crown_row:
+                    moves.append(next_path)
+                else:
+                    # A jumped piece stays on the board until the move ends but cannot be jumped twice
+                    before = len(moves)
+                    self._add_jump_paths(next_path, land_sq, jumps, crown_row, opp & ~mid, empty, moves)
+                    if len(moves) == before:
+                        moves.append(next_path)
 
 
     def check_promotion(self, r, c):
         """Promote a piece to king if it reaches the farthest row."""
-        piece = self.board[r][c]
-        last_row = len(self.board) - 1  # Bottom row (0-indexed)
+        bit = square_bit(r, c)
+        if self.kings & bit:
+            return False
 
-        if piece == 'B' and r == 0:      # Black reaches top row (promote to BK)
-            self.board[r][c] = 'BK'
+        if self.black & bit and r == 0:      # Black reaches top row (promote to BK)
+            self._crown(bit)
             return True
-        elif piece == 'R' and r == last_row:  # Red reaches bottom row (promote to RK)
-            self.board[r][c] = 'RK'
+        elif self.red & bit and r == 7:  # Red reaches bottom row (promote to RK)
+            self._crown(bit)
             return True
         return False
-    
+
     def check_winner(self):
         """Check if the game has a winner by counting all pieces (including kings)."""
-        black_count = 0
-        red_count = 0
-        
-        for row in self.board:
-            for piece in row:
-                if piece in ('B','BK'):  # Counts both 'B' and 'BK'
-                    black_count += 1
-                elif piece in ('R','RK'):  # Counts both 'R' and 'RK'
-                    red_count += 1
-        
-        if black_count == 0:
+        if not self.black:
             return "Red Wins!"  # No black pieces left
-        elif red_count == 0:
+        elif not self.red:
             return "Black Wins!"  # No red pieces left
         return None  # No winner yet
-    
+
+# Weights of the evaluate_checkers terms
+DEFAULT_WEIGHTS = {
+    "material": 1.0,
+    "mobility": 0.4,
+    "center_control": 0.3,
+    "promotion_potential": 0.3,
+    "king_safety": 0.4,
+    "vulnerability": 0.6,
+    "clustering": 0.3,
+    "edge_safety": 0.2,
+    "tempo": 0.25,
+}
+
+
+def merge_weights(overrides, source='weights'):
+    """Returns DEFAULT_WEIGHTS updated with overrides; source names them in the error for unknown keys."""
+    unknown = set(overrides) - set(DEFAULT_WEIGHTS)
+    if unknown:
+        raise ValueError(f'{source}: unknown weights {sorted(unknown)}')
+    weights = dict(DEFAULT_WEIGHTS)
+    weights.update(overrides)
+    return weights
+
+
+def load_weights(path):
+    """Reads a JSON weights file such as tune.py writes; returns DEFAULT_WEIGHTS updated with it."""
+    with open(path) as f:
+        return merge_weights(json.load(f), path)
+
+
+# Bound types stored in the transposition table
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+# Endgame tablebase results, from the side to move's point of view (see tablebase.py)
+UNKNOWN, WIN, LOSS, DRAW = 0, 1, 2, 3
+TABLEBASE_WIN = 100000  # Score of a tablebase win, less the plies it takes
+
+
+class TranspositionTable:
+    """
+    Fixed-size table of search results keyed by Zobrist hash.
+
+    Each bucket has two slots: the depth-preferred slot keeps the deepest result
+    stored for that bucket, the always-replace slot takes whatever came last.
+    Entries are tuples (key, depth, score, bound, best_move).
+    """
+
+    def __init__(self, size=1 << 16):
+        """
+        Parameters:
+        size (int): Number of buckets, rounded down to a power of two.
+        """
+        self.size = 1 << (max(size, 1).bit_length() - 1)
+        self.mask = self.size - 1
+        self.clear()
+
+    def clear(self):
+        self.deep = [None] * self.size
+        self.recent = [None] * self.size
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0  # Misses where the bucket held other positions
+
+    def probe(self, key):
+        """Returns the entry stored for key, or None."""
+        i = key & self.mask
+        deep = self.deep[i]
+        if deep is not None and deep[0] == key:
+            self.hits += 1
+            return deep
+        recent = self.recent[i]
+        if recent is not None and recent[0] == key:
+            self.hits += 1
+            return recent
+        self.misses += 1
+        if deep is not None or recent is not None:
+            self.collisions += 1
+        return None
+
+    def peek(self, key):
+        """Like probe, but leaves the hit/miss counters alone."""
+        i = key & self.mask
+        for entry in (self.deep[i], self.recent[i]):
+            if entry is not None and entry[0] == key:
+                return entry
+        return None
+
+    def store(self, key, depth, score, bound, best_move):
+        i = key & self.mask
+        entry = (key, depth, score, bound, best_move)
+        deep = self.deep[i]
+        if deep is None or deep[0] == key or depth >= deep[1]:
+            self.deep[i] = entry
+            if deep is not None and deep[0] != key:
+                self.recent[i] = deep  # Keep the displaced result one more round
+        else:
+            self.recent[i] = entry
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "collisions": self.collisions}
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when best_move's time budget runs out."""
+
+
+class SearchStats:
+    """
+    What an instrumented best_move spent its effort on, see AI_Algo(instrument=True).
+    Only the in-process part of a parallel search is recorded.
+    """
+
+    def __init__(self):
+        self.nodes_per_ply = {}  # minimax nodes by ply from the root
+        self.quiescence_nodes_per_ply = {}  # quiescence nodes by ply from the root
+        self.leaf_evaluations = 0  # evaluate_checkers calls
+        self.cutoffs = 0
+        self.cutoff_index = {}  # Cutoffs by the index of the move that caused them
+        self.time = {'movegen': 0.0, 'eval': 0.0, 'make_unmake': 0.0}  # Seconds
+        self.max_depth = 0  # Deepest ply reached, quiescence included
+        self.started = time.perf_counter()
+        self.elapsed = 0.0  # Seconds since the search started
+
+    @property
+    def nodes(self):
+        return sum(self.nodes_per_ply.values()) + sum(self.quiescence_nodes_per_ply.values())
+
+    def as_dict(self):
+        """The statistics as plain JSON-friendly types."""
+        return {
+            'nodes': self.nodes,
+            'nodes_per_ply': self.nodes_per_ply,
+            'quiescence_nodes_per_ply': self.quiescence_nodes_per_ply,
+            'leaf_evaluations': self.leaf_evaluations,
+            'cutoffs': self.cutoffs,
+            'cutoff_index': self.cutoff_index,
+            'time': dict(self.time),
+            'max_depth': self.max_depth,
+            'elapsed': self.elapsed,
+        }
+
+
+# Per-process search state of root-splitting workers, see AI_Algo(workers=...)
+_worker_ai = None
+
+
+def _init_search_worker(tt_size, tablebase, quiescence_depth, stop_value):
+    global _worker_ai
+    _worker_ai = AI_Algo(Board(), tt_size, quiescence_depth=quiescence_depth, tablebase=tablebase)
+    _worker_ai._stop_value = stop_value
+
+
+def _search_root_move(position, move, depth, alpha, weights, budget, fresh_tt, stop_id):
+    """
+    Worker side of the parallel root search: scores one root move.
+
+    Parameters:
+    position (tuple): The root position as Board.bitboards() ints.
+    move (list): The root move to search.
+    depth (int): Search depth including the root move.
+    alpha (float): Lower bound already achieved by another root move.
+    weights (dict): Evaluation weights of the calling AI_Algo.
+    budget (float): Seconds left for the search, or None for no limit.
+    fresh_tt (bool): Clear the worker's transposition table first (deterministic mode).
+    stop_id (int): Number of the parallel search; it stops once the caller sets the shared
+                   stop value to this number or higher.
+
+    Returns:
+    tuple: (score, nodes, quiescence nodes, principal variation), or None if the budget ran out
+    or the search was stopped.
+    """
+    ai = _worker_ai
+    ai.board.load_bitboards(*position)
+    ai.weights = weights
+    ai.nodes = ai.quiescence_nodes = 0
+    if fresh_tt:
+        ai.tt.clear()
+    ai._stop_id = stop_id
+    # A deadline, even one never reached, makes the search look at the stop value
+    ai._deadline = float('inf') if budget is None else time.perf_counter() + budget
+    try:
+        ai.board.make_move(move)
+        score = ai.minimax(depth - 1, is_maximizing=False, alpha=alpha, beta=float('inf'))
+        ai.board.unmake_move()
+    except SearchTimeout:
+        return None
+    finally:
+        ai._deadline = None
+    return score, ai.nodes, ai.quiescence_nodes, ai.principal_variation(move, depth)
+
+
 class AI_Algo:
-    def __init__(self, board):
+    def __init__(self, board, tt_size=1 << 16, workers=None, deterministic=False, quiescence_depth=8,
+                 tablebase=None, book=None, instrument=False, stats_callback=None, stats_interval=1.0,
+                 weights=None):
         """
         Initializes the AI algorithm with a game board.
         
         Parameters:
         board (object): The board object representing the checkers game state.
+        tt_size (int): Number of transposition table buckets.
+        workers (int): Split root moves across this many processes; None searches in-process.
+        deterministic (bool): Make the parallel search return the same move and score as
+        an in-process search from an empty transposition table (for testing).
+        quiescence_depth (int): Most capture moves the quiescence search adds past the horizon.
+        tablebase (EndgameTablebase): Endgame tablebase probed once few enough pieces are left, or None.
+        book (OpeningBook): Opening book played from before searching, or None.
+        instrument (bool): Record a SearchStats for every best_move in search_stats. Costs
+        nothing when off; when on, the search methods are wrapped for the duration of the call.
+        stats_callback (callable): With instrument, called as stats_callback(stats) every
+        stats_interval seconds during the search and once at its end.
+        stats_interval (float): Seconds between stats_callback calls.
+        weights (dict or str): Evaluation weights, or the path of a weights file (see load_weights);
+        missing keys keep their DEFAULT_WEIGHTS value, and None uses DEFAULT_WEIGHTS.
         """
         self.board = board
+        if weights is None:
+            self.weights = dict(DEFAULT_WEIGHTS)
+        elif isinstance(weights, str):
+            self.weights = load_weights(weights)
+        else:
+            self.weights = merge_weights(weights)
+        self.tt_size = tt_size
+        self.tt = TranspositionTable(tt_size)
+        self.workers = workers
+        self.deterministic = deterministic
+        self.nodes = 0  # Nodes visited by the current/last search
+        self.quiescence_nodes = 0  # ... and by its quiescence searches
+        self.quiescence_depth = quiescence_depth
+        self.tablebase = tablebase
+        self.book = book
+        self.instrument = instrument
+        self.stats_callback = stats_callback
+        self.stats_interval = stats_interval
+        self.search_stats = None  # SearchStats of the last instrumented best_move
+
+        # Pondering, see start_pondering
+        self._ponderer = None
+        self._ponder_thread = None
+        self._pondered = None  # (position key, iterations) completed for the predicted reply
+        self._deadline = None  # perf_counter() time at which the search must stop
+        self._pool = None
+        # Root-splitting workers stop once _stop_value (shared with them) reaches the
+        # _stop_id of their search
+        self._stop_value = None
+        self._stop_id = 0
+
+        # Move ordering state: two killer moves per ply and a history score per (start, end)
+        self.killers = {}
+        self.history = {}
+        self.cutoffs = 0  # Beta/alpha cutoffs in the last best_move
+        self.first_move_cutoffs = 0  # ... of which happened on the first move searched
+
+        # Kept from one best_move to the next
+        self.pv = []  # Principal variation of the last search
+        self._expected_key = None  # Position two plies down self.pv, where the next search should start
+
+    def stop(self):
+        """
+        Makes a running best_move return the move of its last completed iteration,
+        as if its time limit had run out. May be called from another thread.
+        """
+        self._deadline = 0.0
+        if self._stop_value is not None:
+            self._stop_value.value = self._stop_id  # Root moves running in worker processes
+
+    def start_pondering(self, max_depth=64, all_replies=False):
+        """
+        Searches on the opponent's time: call it once Red's move is on self.board and Black
+        is to move. The search runs in a background thread on a copy of the board and shares
+        this AI's transposition table, killers and history, so its work carries over.
+
+        By default it searches the position after the reply the last search expected; when
+        that reply is played, best_move continues from the depth pondering completed. With
+        all_replies, or without an expected reply, it searches the Black-to-move position
+        itself, which fills the transposition table for every reply.
+
+        Parameters:
+        max_depth (int): Deepest iteration to ponder.
+        all_replies (bool): Do not guess the reply.
+        """
+        self.stop_pondering()
+        ponderer = copy.copy(self)
+        ponderer.board = self.board.copy()
+        ponderer.workers = None
+        ponderer.instrument = False
+        ponderer.book = None
+        ponderer._pool = None
+        ponderer._stop_value = None
+        ponderer._pondered = None
+        ponderer._deadline = float('inf')  # Never reached, but lets stop() end the search
+
+        reply = None
+        if not all_replies:
+            entry = self.tt.peek(position_key(ponderer.board, 'B'))
+            if entry is not None and entry[4] in ponderer.board.get_legal_moves('B'):
+                reply = entry[4]
+
+        if reply is not None:
+            self._expected_key = None  # The ponderer moves the killers on to the next turn
+        self._ponderer = ponderer
+        self._ponder_thread = threading.Thread(target=self._ponder, args=(ponderer, reply, max_depth),
+                                               daemon=True)
+        self._ponder_thread.start()
+
+    def _ponder(self, ponderer, reply, max_depth):
+        """Body of the pondering thread."""
+        board = ponderer.board
+        if reply is None:
+            try:
+                for depth in range(1, max_depth + 1):
+                    ponderer.minimax(depth, is_maximizing=False)
+            except SearchTimeout:
+                pass
+            return
+
+        board.make_move(reply)
+        key = position_key(board, 'R')
+        iterations = []
+
+        def on_iteration(info):
+            iterations.append(info)
+            self._pondered = (key, list(iterations))
+
+        ponderer.best_move(max_depth=max_depth, return_stats=True, on_iteration=on_iteration)
+
+    def stop_pondering(self):
+        """Stops a running start_pondering search and waits for its thread to finish."""
+        thread = self._ponder_thread
+        if thread is None:
+            return
+        while thread.is_alive():
+            self._ponderer.stop()  # Repeated in case the search had not set its deadline yet
+            thread.join(0.01)
+        self._ponderer = self._ponder_thread = None
+
+    def close(self):
+        """Shuts down the worker processes of a parallel AI_Algo."""
+        self.stop_pondering()
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
     # def evaluate_checkers(self, player):
     #     pawn_value = 100
     #     king_value = 150
@@ -314,118 +1085,74 @@ class AI_Algo:
     #     return total_score
 
     def evaluate_checkers(self, player):
-        pawn_value = 100
-        king_value = 160
-
-        weights = {
-            "material": 1.0,
-            "mobility": 0.4,
-            "center_control": 0.3,
-            "promotion_potential": 0.3,
-            "king_safety": 0.4,
-            "threats": 0.6,
-            "multi_jump": 0.5,
-            "vulnerability": 0.6,
-            "clustering": 0.3,
-            "edge_safety": 0.2,
-            "tempo": 0.25,
-        }
-
-        score = {key: 0 for key in weights}
-
-        center_squares = {(r, c) for r in range(2, 6) for c in range(2, 6)}
-        edge_squares = {(r, c) for r in range(8) for c in [0, 7]} | {(0, c) for c in range(8)} | {(7, c) for c in range(8)}
-
-        player_pieces, opponent_pieces = (
-            (('R', 'RK'), ('B', 'BK')) if player == 'R' else (('B', 'BK'), ('R', 'RK'))
-        )
-
+        board = self.board
         opponent = 'B' if player == 'R' else 'R'
-        tempo_count = 0
-
-        def in_bounds(r, c):
-            return 0 <= r < 8 and 0 <= c < 8
-
-        for row in range(8):
-            for col in range(8):
-                piece = self.board.board[row][col]
-                if piece not in player_pieces + opponent_pieces:
-                    continue
-
-                is_king = piece.endswith('K')
-                is_player = piece in player_pieces
-                forward_dir = -1 if piece in ('B', 'BK') else 1
-
-                # Material
-                base_val = king_value if is_king else pawn_value
-                score["material"] += base_val if is_player else -base_val
-
-                # Center Control
-                if (row, col) in center_squares:
-                    score["center_control"] += (12 if is_king else 8) * (1 if is_player else -1)
-
-                # Edge Safety
-                if (row, col) in edge_squares:
-                    score["edge_safety"] += 6 * (1 if is_player else -1)
-
-                # Promotion Potential
-                if not is_king:
-                    target_row = 0 if piece.startswith('B') else 7
-                    prom_distance = abs(target_row - row)
-                    score["promotion_potential"] += (7 - prom_distance) * 4 * (1 if is_player else -1)
-
-                # King Safety
-                if is_king and (row == 0 or row == 7):
-                    score["king_safety"] += 15 * (1 if is_player else -1)
-
-                # Mobility
-                mobility = self.count_legal_moves(row, col, player if is_player else opponent)
-                mobility_weight = 8 if is_king else 5
-                score["mobility"] += mobility * mobility_weight * (1 if is_player else -1)
-
-                # Threats and Multi-Jump
-                directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)] if is_king else (
-                    [(-1, -1), (-1, 1)] if piece.startswith('B') else [(1, -1), (1, 1)]
-                )
-
-                enemy_set = set(opponent_pieces if is_player else player_pieces)
-                jumps = self.find_jump_moves(row, col, enemy_set, directions)
-                if jumps:
-                    max_jumps = self.count_continuation_jumps(row, col, enemy_set, directions)
-                    score["threats"] += 10 * (1 if is_player else -1)
-                    score["multi_jump"] += max_jumps * 10 * (1 if is_player else -1)
-
-                # Vulnerability (if adjacent to opponent and no backup)
-                vulnerable = False
-                for dr, dc in directions:
-                    nr, nc = row + dr, col + dc
-                    if in_bounds(nr, nc) and self.board.board[nr][nc] in enemy_set:
-                        backup_r, backup_c = row - dr, col - dc
-                        if not in_bounds(backup_r, backup_c) or self.board.board[backup_r][backup_c] not in player_pieces:
-                            vulnerable = True
-                            break
-                if vulnerable:
-                    score["vulnerability"] -= 15 if is_player else -15
-
-                # Clustering (pieces near each other)
-                cluster_count = 0
-                for dr in [-1, 0, 1]:
-                    for dc in [-1, 0, 1]:
-                        if dr == 0 and dc == 0:
-                            continue
-                        nr, nc = row + dr, col + dc
-                        if in_bounds(nr, nc) and self.board.board[nr][nc] in player_pieces:
-                            cluster_count += 1
-                score["clustering"] += cluster_count * (2 if is_player else -2)
-
-                # Tempo (advancing aggressively)
-                if not is_king and is_player:
-                    tempo_count += (row if player == 'R' else (7 - row))
-
-        # Tempo advantage
-        score["tempo"] += tempo_count * 0.5
+        own, opp = board.pieces(player)
+        kings = board.kings
+        empty = FULL_BOARD & ~(own | opp)
+
+        # Material, center, edge, promotion, king safety and tempo come from the
+        # running sums Board updates on every move
+        terms = board.terms
+        mine, theirs = (0, BLACK_TERMS) if player == 'R' else (BLACK_TERMS, 0)
+        advanced = terms[mine + TERM_ADVANCED]
+
+        score = dict.fromkeys(self.weights, 0)
+        score["material"] = terms[mine + TERM_MATERIAL] - terms[theirs + TERM_MATERIAL]
+        score["center_control"] = terms[mine + TERM_CENTER] - terms[theirs + TERM_CENTER]
+        score["edge_safety"] = terms[mine + TERM_EDGE] - terms[theirs + TERM_EDGE]
+        score["promotion_potential"] = 4 * (advanced - terms[theirs + TERM_ADVANCED])
+        score["king_safety"] = terms[mine + TERM_KING_SAFETY] - terms[theirs + TERM_KING_SAFETY]
+        score["tempo"] = advanced * 0.5
+
+        # The neighbourhood terms are recomputed set-wise from the bitboards.
+        # shifted[d] holds every square one step in direction d.
+        own_shifted = neighbours(own)
+        opp_shifted = neighbours(opp)
+        empty_shifted = neighbours(empty)
+
+        # Each term is computed for one side at a time; sign flips it for the opponent
+        for colour, side, enemy, side_shifted, enemy_shifted, sign in (
+                (player, own, opp, own_shifted, opp_shifted, 1),
+                (opponent, opp, own, opp_shifted, own_shifted, -1)):
+            men = side & ~kings
+            side_kings = side & kings
+            man_directions = MAN_DIRECTIONS[colour]
+
+            # Pieces with a capture available; jump_sources[d] holds the squares a jump in direction d starts from
+            jumpers = 0
+            jump_sources = []
+            for d in KING_DIRECTIONS:
+                back = OPPOSITE[d]
+                jump_sources.append(STEP[back](empty_shifted[back] & enemy))
+                movers = side if d in man_directions else side_kings
+                jumpers |= movers & jump_sources[d]
+
+            # Mobility: single jumps for pieces that must capture, simple diagonal moves for the rest.
+            # Capture sequences themselves are resolved by the quiescence search.
+            mobility = 0
+            for d in KING_DIRECTIONS:
+                open_squares = (jumpers & jump_sources[d]) | (~jumpers & empty_shifted[OPPOSITE[d]])
+                if d in man_directions:
+                    mobility += 5 * (men & open_squares).bit_count()
+                mobility += 8 * (side_kings & open_squares).bit_count()
+            score["mobility"] += sign * mobility
+
+            # Vulnerability (adjacent to an enemy with no friendly backup behind)
+            vulnerable = 0
+            for d in KING_DIRECTIONS:
+                movers = side if d in man_directions else side_kings
+                vulnerable |= movers & enemy_shifted[OPPOSITE[d]] & ~own_shifted[d]
+            score["vulnerability"] -= sign * 15 * vulnerable.bit_count()
+
+            # Clustering (friendly pieces diagonally adjacent)
+            cluster_count = 0
+            for d in KING_DIRECTIONS:
+                cluster_count += (side_shifted[d] & own).bit_count()
+            score["clustering"] += sign * 2 * cluster_count
 
         # Combine all weighted scores
+        weights = self.weights
         total_score = sum(weights[key] * score[key] for key in score)
         return total_score
 
@@ -528,42 +1255,48 @@ class AI_Algo:
         Returns:
         int: The total number of legal moves possible for the given piece.
         """
-        
-        # Determine the list of directions
-        king_directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-        directions = king_directions if self.board.is_king(row, col) else (
-            [(-1, -1), (-1, 1)] if player=='B' else [(1, -1), (1, 1)]
-        )
-        
-        # Determine the opponent's piece
-        opponent_pieces = ('R','RK') if player=='B' else ('B','BK')
-        
-        jump_moves = self.find_jump_moves(row, col, opponent_pieces, directions)
-        
+        bit = square_bit(row, col)
+        sq = bit.bit_length() - 1
+        _, opp = self.board.pieces(player)
+        empty = self.board.empty_squares()
+        kind = KIND_BASE[player] + (1 if self.board.kings & bit else 0)
+
+        jump_moves = self._jump_landings(sq, kind, opp, empty)
+
         if jump_moves:
             # Count all possible jump sequences (including multi-jumps)
             total = 0
-            for jump_sequence in jump_moves:
-                total += self.count_continuation_jumps(jump_sequence[0], jump_sequence[1], opponent_pieces, directions)
+            for landing in jump_moves:
+                total += self._continuation_jumps(landing, kind, opp, empty)
             return total
         else:
             # Count simple diagonal moves
-            return self.count_simple_moves(row, col, directions)
+            return sum(1 for target, _ in STEP_TARGETS[kind][sq] if target & empty)
+
+    def _opponent_bitboard(self, opponent_pieces):
+        """Maps a collection of opponent piece codes to the matching bitboard."""
+        return self.board.red if 'R' in opponent_pieces else self.board.black
 
     def find_jump_moves(self, row, col, opponent_pieces, directions):
+        sq = square_bit(row, col).bit_length() - 1
+        opp = self._opponent_bitboard(opponent_pieces)
+        empty = self.board.empty_squares()
         jumps = []
-        
+
         for dr, dc in directions:
-            jump_row, jump_col = row + dr, col + dc
-            land_row, land_col = row + 2*dr, col + 2*dc
-        
-            if (0 <= land_row < 8 and 0 <= land_col < 8 and
-                self.board.board[land_row][land_col] == 'X' and
-                self.board.board[jump_row][jump_col] in opponent_pieces):
-                jumps.append((land_row, land_col))
-        
+            d = DIRECTION_OF[(dr, dc)]
+            mid = NEIGHBOURS[sq][d]
+            if mid & opp:
+                land = NEIGHBOURS[mid.bit_length() - 1][d]
+                if land & empty:
+                    jumps.append(bit_coords(land))
+
         return jumps
 
+    def _jump_landings(self, sq, kind, opp, empty):
+        """Returns the landing squares of every single jump a piece of the given kind on sq can make."""
+        return [land_sq for mid, land, land_sq in JUMP_TARGETS[kind][sq] if mid & opp and land & empty]
+
     def count_continuation_jumps(self, row, col, opponent_pieces, directions):
         """
         Counts the maximum number of continuation jumps possible from a given position,
@@ -578,40 +1311,39 @@ class AI_Algo:
         Returns:
         int: The maximum number of jumps possible in a sequence.
         """
+        directions = tuple(sorted(DIRECTION_OF[d] for d in directions))
+        kind = KIND_DIRECTIONS.index(directions)
+        return self._continuation_jumps(square_bit(row, col).bit_length() - 1, kind,
+                                        self._opponent_bitboard(opponent_pieces), self.board.empty_squares())
+
+    def _continuation_jumps(self, sq, kind, opp, empty):
+        jumps = JUMP_TARGETS[kind]
         max_jumps = 0
-        stack = [(row, col, 0, set())]  # (row, col, jump_count, visited)
+        stack = [(sq, 0, 0)]  # (square, jump_count, visited bits)
 
         while stack:
-            current_row, current_col, jumps, visited = stack.pop()
-            current_pos = (current_row, current_col)
-            
-            # Skip if we've already been here with a higher or equal jump count
-            if current_pos in visited:
+            current, jump_count, visited = stack.pop()
+            bit = 1 << current
+
+            # Skip if we've already been here on this path
+            if bit & visited:
                 continue
-                
+
             # Add current position to visited
-            new_visited = set(visited)
-            new_visited.add(current_pos)
-            
+            visited |= bit
+
             found_jump = False
-            
-            for dr, dc in directions:
-                jump_row, jump_col = current_row + dr, current_col + dc
-                land_row, land_col = current_row + 2 * dr, current_col + 2 * dc
-
-                if (0 <= land_row < 8 and 0 <= land_col < 8 and
-                    self.board.board[land_row][land_col] == 'X' and
-                    self.board.board[jump_row][jump_col] in opponent_pieces and
-                    (jump_row, jump_col) not in new_visited):  # Don't jump over same piece twice
-                    
+
+            for mid, land, land_sq in jumps[current]:
+                if mid & opp and not mid & visited and land & empty:  # Don't jump over same piece twice
                     # Push the new position with incremented jump count
-                    stack.append((land_row, land_col, jumps + 1, new_visited))
+                    stack.append((land_sq, jump_count + 1, visited))
                     found_jump = True
 
             # If no more jumps from this position, update max_jumps
             if not found_jump:
-                max_jumps = max(max_jumps, jumps)
-        
+                max_jumps = max(max_jumps, jump_count)
+
         return max_jumps if max_jumps > 0 else 1
 
     def count_simple_moves(self, row, col, directions):
@@ -626,128 +1358,564 @@ class AI_Algo:
         Returns:
         int: The total number of simple diagonal moves possible.
         """
-        total_moves = 0
-        for dr, dc in directions:
-            land_row, land_col = row + dr, col + dc
-        
-            if (0 <= land_row < 8 and 0 <= land_col < 8 and
-                self.board.board[land_row][land_col] == 'X'):
-                total_moves += 1
-
-        return total_moves
+        return len(self.get_simple_moves(row, col, directions))
 
 
-    def get_legal_moves(self):
-        legal_moves = [] # [[(start_pos),(end)]]
-        opponent_pieces = ('B','BK')
-
-        for r in range(8):
-            for c in range(8):
-                if self.board.board[r][c] in ('R', 'RK'): #  AI
-                    # Determine the list of directions
-                    king_directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-                    directions = king_directions if self.board.is_king(r, c) else [(1, -1), (1, 1)]
+    def get_legal_moves(self, player='R'):
+        """
+        Returns the legal moves of player ('R' is the AI) as paths [(r, c), ..., (r, c)],
+        with forced captures and complete multi-jumps. See Board.get_legal_moves.
+        """
+        return self.board.get_legal_moves(player)
 
-                    jump_moves = self.find_jump_moves(r, c, opponent_pieces, directions)
-                    if jump_moves:
-                        for jumps in jump_moves:
-                            legal_moves.append([(r,c), jumps])
-                    else:
-                        simple_moves = self.get_simple_moves(r, c, directions)
-                        
-                        if simple_moves:
-                            for moves in simple_moves:
-                                legal_moves.append([(r,c), moves])
-                    
-        return legal_moves
-                
     def get_simple_moves(self, r, c, directions):
+        sq = square_bit(r, c).bit_length() - 1
+        empty = self.board.empty_squares()
         simple_moves = []
         for dr, dc in directions:
-            land_row, land_col = r + dr, c + dc
-        
-            if (0 <= land_row < 8 and 0 <= land_col < 8 and
-                self.board.board[land_row][land_col] == 'X'):
-                simple_moves.append((land_row, land_col))
+            land = NEIGHBOURS[sq][DIRECTION_OF[(dr, dc)]]
+            if land & empty:
+                simple_moves.append(bit_coords(land))
 
         return simple_moves
 
-    def minimax(self, depth, is_maximizing, alpha=-float('inf'), beta=float('inf')):
-        if depth == 0 or self.board.check_winner() is not None:
+    def order_moves(self, moves, ply, tt_move=None):
+        """
+        Sorts moves in place so the likeliest cutoffs come first: the transposition
+        table move, then captures by the number of pieces taken, then the two killer
+        moves of this ply, then the rest by history score.
+        """
+        killers = self.killers.get(ply, ())
+        history = self.history
+
+        def priority(move):
+            if move == tt_move:
+                return 3_000_000
+            if abs(move[1][0] - move[0][0]) == 2:
+                return 2_000_000 + len(move)
+            if move in killers:
+                return 1_000_000 - killers.index(move)
+            return history.get((move[0], move[-1]), 0)
+
+        moves.sort(key=priority, reverse=True)
+
+    def _record_cutoff(self, move, index, depth, ply):
+        """Updates the cutoff counters, killers and history after move caused a cutoff."""
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+        if abs(move[1][0] - move[0][0]) == 2:
+            return  # Captures are ordered first anyway
+        killers = self.killers.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+        key = (move[0], move[-1])
+        self.history[key] = self.history.get(key, 0) + depth * depth
+
+    def _start_instrumentation(self):
+        """
+        Shadows the search methods of this AI and its board with counting and timing
+        wrappers that fill a fresh self.search_stats; _stop_instrumentation removes them.
+        """
+        stats = self.search_stats = SearchStats()
+        board = self.board
+        clock = time.perf_counter
+        start = stats.started
+        minimax, quiescence = self.minimax, self.quiescence
+        evaluate, record_cutoff = self.evaluate_checkers, self._record_cutoff
+        callback, interval = self.stats_callback, self.stats_interval
+        next_report = start + interval
+        horizon_ply = 0  # Ply of the last minimax node, where a quiescence search starts
+
+        def counted_minimax(depth, is_maximizing, alpha=-float('inf'), beta=float('inf'), ply=1):
+            nonlocal horizon_ply, next_report
+            horizon_ply = ply
+            stats.nodes_per_ply[ply] = stats.nodes_per_ply.get(ply, 0) + 1
+            if ply > stats.max_depth:
+                stats.max_depth = ply
+            if callback is not None and clock() >= next_report:
+                next_report = clock() + interval
+                stats.elapsed = clock() - start
+                callback(stats)
+            return minimax(depth, is_maximizing, alpha, beta, ply)
+
+        def counted_quiescence(is_maximizing, alpha=-float('inf'), beta=float('inf'), extension=0):
+            ply = horizon_ply + extension
+            stats.quiescence_nodes_per_ply[ply] = stats.quiescence_nodes_per_ply.get(ply, 0) + 1
+            if ply > stats.max_depth:
+                stats.max_depth = ply
+            return quiescence(is_maximizing, alpha, beta, extension)
+
+        def counted_cutoff(move, index, depth, ply):
+            stats.cutoffs += 1
+            stats.cutoff_index[index] = stats.cutoff_index.get(index, 0) + 1
+            record_cutoff(move, index, depth, ply)
+
+        timing = False  # A timed call is running; calls nested in it are not timed again
+
+        def timed(function, field):
+            def wrapper(*args):
+                nonlocal timing
+                if timing:
+                    return function(*args)
+                timing = True
+                begin = clock()
+                try:
+                    return function(*args)
+                finally:
+                    timing = False
+                    stats.time[field] += clock() - begin
+            return wrapper
+
+        def counted_evaluate(player):
+            stats.leaf_evaluations += 1
+            return timed_evaluate(player)
+
+        timed_evaluate = timed(evaluate, 'eval')
+        self.minimax = counted_minimax
+        self.quiescence = counted_quiescence
+        self._record_cutoff = counted_cutoff
+        self.evaluate_checkers = counted_evaluate
+        board.get_legal_moves = timed(board.get_legal_moves, 'movegen')
+        board.jumpers = timed(board.jumpers, 'movegen')
+        board.make_move = timed(board.make_move, 'make_unmake')
+        board.unmake_move = timed(board.unmake_move, 'make_unmake')
+
+    def _stop_instrumentation(self):
+        """Removes the wrappers of _start_instrumentation and reports the final statistics."""
+        for name in ('minimax', 'quiescence', '_record_cutoff', 'evaluate_checkers'):
+            del self.__dict__[name]
+        for name in ('get_legal_moves', 'jumpers', 'make_move', 'unmake_move'):
+            del self.board.__dict__[name]
+        stats = self.search_stats
+        stats.elapsed = time.perf_counter() - stats.started
+        if self.stats_callback is not None:
+            self.stats_callback(stats)
+
+    def _stopped(self):
+        """True once the shared stop value of a root-splitting search reaches this search's number."""
+        return self._stop_value is not None and self._stop_value.value >= self._stop_id
+
+    def first_move_cutoff_rate(self):
+        """Share of cutoffs in the last best_move that came from the first move searched."""
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def minimax(self, depth, is_maximizing, alpha=-float('inf'), beta=float('inf'), ply=1):
+        self.nodes += 1
+        if self._deadline is not None and (time.perf_counter() > self._deadline or self._stopped()):
+            raise SearchTimeout
+
+        if self.board.check_winner() is not None:
             return self.evaluate_checkers('R')  # Uses self.board
+        tablebase = self.tablebase
+        if tablebase is not None and (self.board.red | self.board.black).bit_count() <= tablebase.max_pieces:
+            found = tablebase.probe(self.board, 'R' if is_maximizing else 'B')
+            if found is not None:
+                return self._tablebase_score(found, is_maximizing, ply)
+        if depth == 0:
+            return self.quiescence(is_maximizing, alpha, beta)
+
+        # Transposition table lookup (scores are always from Red's point of view)
+        key = position_key(self.board, 'R' if is_maximizing else 'B')
+        entry = self.tt.probe(key)
+        tt_move = None
+        if entry is not None:
+            _, tt_depth, tt_score, bound, tt_move = entry
+        if entry is not None and tt_depth >= depth:
+            if bound == EXACT:
+                return tt_score
+            if bound == LOWER_BOUND:
+                alpha = max(alpha, tt_score)
+            else:
+                beta = min(beta, tt_score)
+            if beta <= alpha:
+                return tt_score
+        alpha_orig, beta_orig = alpha, beta
+
+        legal_moves = self.get_legal_moves('R' if is_maximizing else 'B')  # Uses self.board
+        if len(legal_moves) > 1:
+            self.order_moves(legal_moves, ply, tt_move)
+        board = self.board
+        best = None
 
-        legal_moves = self.get_legal_moves()  # Uses self.board
-        
         if is_maximizing:
             max_eval = -float('inf')
-            for move in legal_moves:
-                board_copy = copy.deepcopy(self.board)
-                self.apply_move_to_board(move, board_copy)
-                eval_score = self.minimax(depth - 1, False, alpha, beta)
-                max_eval = max(max_eval, eval_score)
+            for index, move in enumerate(legal_moves):
+                board.make_move(move)
+                eval_score = self.minimax(depth - 1, False, alpha, beta, ply + 1)
+                board.unmake_move()
+                if eval_score > max_eval:
+                    max_eval, best = eval_score, move
                 alpha = max(alpha, eval_score)
                 if beta <= alpha:
+                    self._record_cutoff(move, index, depth, ply)
                     break  # Beta cutoff
-            return max_eval
+            result = max_eval
         else:
             min_eval = float('inf')
-            for move in legal_moves:
-                board_copy = copy.deepcopy(self.board)
-                self.apply_move_to_board(move, board_copy)
-                eval_score = self.minimax(depth - 1, True, alpha, beta)
-                min_eval = min(min_eval, eval_score)
+            for index, move in enumerate(legal_moves):
+                board.make_move(move)
+                eval_score = self.minimax(depth - 1, True, alpha, beta, ply + 1)
+                board.unmake_move()
+                if eval_score < min_eval:
+                    min_eval, best = eval_score, move
                 beta = min(beta, eval_score)
                 if beta <= alpha:
+                    self._record_cutoff(move, index, depth, ply)
                     break  # Alpha cutoff
-            return min_eval
-            
-    def best_move(self, must_continue_from=None):
+            result = min_eval
+
+        if result <= alpha_orig:
+            bound = UPPER_BOUND
+        elif result >= beta_orig:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.tt.store(key, depth, result, bound, best)
+        return result
+
+    def quiescence(self, is_maximizing, alpha=-float('inf'), beta=float('inf'), extension=0):
+        """
+        Searches capture sequences past the horizon so pending captures are played
+        out before the position is evaluated. Captures are compulsory, so there is no
+        stand-pat: a side with a capture available must take it.
+
+        Parameters:
+        is_maximizing (bool): True when Red is to move.
+        alpha (float): Best score Red is already guaranteed.
+        beta (float): Best score Black is already guaranteed.
+        extension (int): Capture moves played since the horizon, capped at quiescence_depth.
+
+        Returns:
+        float: The score from Red's point of view once no capture is pending.
+        """
+        self.quiescence_nodes += 1
+        if self._deadline is not None and (time.perf_counter() > self._deadline or self._stopped()):
+            raise SearchTimeout
+
+        player = 'R' if is_maximizing else 'B'
+        board = self.board
+        if (extension >= self.quiescence_depth or board.check_winner() is not None
+                or not board.jumpers(player)):
+            return self.evaluate_checkers('R')
+
+        captures = board.get_legal_moves(player)
+        captures.sort(key=len, reverse=True)  # Take the most pieces first
+
+        if is_maximizing:
+            best = -float('inf')
+            for move in captures:
+                board.make_move(move)
+                score = self.quiescence(False, alpha, beta, extension + 1)
+                board.unmake_move()
+                best = max(best, score)
+                alpha = max(alpha, score)
+                if beta <= alpha:
+                    break
+        else:
+            best = float('inf')
+            for move in captures:
+                board.make_move(move)
+                score = self.quiescence(True, alpha, beta, extension + 1)
+                board.unmake_move()
+                best = min(best, score)
+                beta = min(beta, score)
+                if beta <= alpha:
+                    break
+        return best
+
+    def best_move(self, must_continue_from=None, time_limit_ms=None, max_depth=4, return_stats=False,
+                  on_iteration=None):
+        """
+        Finds Red's best move by iterative deepening: depth 1, 2, ... up to max_depth,
+        stopping early once time_limit_ms has passed.
+
+        Parameters:
+        must_continue_from (tuple): Only consider moves of the piece on this square.
+        time_limit_ms (float): Wall-clock budget for the search, or None for no limit.
+        max_depth (int): Deepest iteration to run, in plies including the move itself.
+        return_stats (bool): Also return the per-iteration statistics.
+        on_iteration (callable): Called with each iteration's statistics as soon as it completes.
+
+        Returns:
+        list: The move from the last completed iteration, as a path [(start_r, start_c), ..., (end_r, end_c)].
+        With return_stats, a (move, iterations) tuple where each iteration is a dict with
+        depth, nodes, quiescence_nodes, elapsed_ms, score and pv (principal variation).
+        """
+        self.stop_pondering()
+        pondered, self._pondered = self._pondered, None
         legal_moves = self.get_legal_moves()
 
         if must_continue_from:
             legal_moves = [move for move in legal_moves if move[0] == must_continue_from]
 
         if not legal_moves or self.board.check_winner() is not None:
-            return self.evaluate_checkers('R')
+            score = self.evaluate_checkers('R')
+            return (score, []) if return_stats else score
+
+        # Few pieces left: the tablebase knows the answer
+        if self.tablebase is not None:
+            move = self._tablebase_move(legal_moves)
+            if move is not None:
+                return (move, []) if return_stats else move
+
+        # Still in the opening: play from the book
+        if self.book is not None:
+            move = self.book.choose(self.board, 'R', legal_moves)
+            if move is not None:
+                return (move, []) if return_stats else move
+
+        start_time = time.perf_counter()
+        self.cutoffs = self.first_move_cutoffs = 0
+        self._deadline = None if time_limit_ms is None else start_time + time_limit_ms / 1000
+        board = self.board
+        base = len(board.undo_stack)
+
+        next_move = legal_moves[0]  # Fallback if not even depth 1 finishes
+        iterations = []
+        first_depth = 1
+        key = position_key(board, 'R')
+
+        # The game followed the last principal variation: the killers of its ply 3 are ours at ply 1
+        # (both tables are updated in place, as a ponderer may share them)
+        if key == self._expected_key:
+            shifted = {ply - 2: moves for ply, moves in self.killers.items() if ply > 2}
+            self.killers.clear()
+            self.killers.update(shifted)
+        # Older history counts less
+        for move, score in list(self.history.items()):
+            self.history[move] = score >> 1
+
+        if pondered is not None and pondered[0] == key and not must_continue_from:
+            # Pondering already searched this position: go on from where it got to
+            iterations = pondered[1]
+            next_move = iterations[-1]['pv'][0]
+            first_depth = iterations[-1]['depth'] + 1
+        else:
+            # An earlier search left an exact result for this position (it was on the principal
+            # variation, or this is a continuation of the same turn): reuse that subtree
+            entry = self.tt.peek(key)
+            if entry is not None and entry[3] == EXACT and entry[4] in legal_moves:
+                _, tt_depth, tt_score, _, next_move = entry
+                first_depth = tt_depth + 1
+                iterations = [{
+                    "depth": tt_depth,
+                    "nodes": 0,
+                    "quiescence_nodes": 0,
+                    "elapsed_ms": 0.0,
+                    "score": tt_score,
+                    "pv": self.principal_variation(next_move, tt_depth),
+                }]
+                if on_iteration is not None:
+                    on_iteration(iterations[-1])
+        if first_depth > 1:
+            legal_moves.remove(next_move)
+            legal_moves.insert(0, next_move)
+
+        if self.instrument:
+            self._start_instrumentation()
+        try:
+            for depth in range(first_depth, max_depth + 1):
+                self.nodes = self.quiescence_nodes = 0
+                try:
+                    if self.workers and self.workers > 1:
+                        move, score, pv = self._search_root_parallel(legal_moves, depth)
+                    else:
+                        move, score = self._search_root(legal_moves, depth)
+                        pv = self.principal_variation(move, depth)
+                except SearchTimeout:
+                    # Unwind the moves the aborted iteration left on the board
+                    while len(board.undo_stack) > base:
+                        board.unmake_move()
+                    break
+                next_move = move
 
+                # Search the best move first in the next iteration
+                legal_moves.remove(move)
+                legal_moves.insert(0, move)
+
+                iterations.append({
+                    "depth": depth,
+                    "nodes": self.nodes,
+                    "quiescence_nodes": self.quiescence_nodes,
+                    "elapsed_ms": (time.perf_counter() - start_time) * 1000,
+                    "score": score,
+                    "pv": pv,
+                })
+                if on_iteration is not None:
+                    on_iteration(iterations[-1])
+                if abs(score) == float('inf'):
+                    break  # Forced win or loss found, deeper search changes nothing
+        finally:
+            self._deadline = None
+            if self.instrument:
+                self._stop_instrumentation()
+
+        self.pv = iterations[-1]["pv"] if iterations else [next_move]
+        self._expected_key = None
+        if len(self.pv) >= 3:
+            board.make_move(self.pv[0])
+            board.make_move(self.pv[1])
+            self._expected_key = position_key(board, 'R')
+            board.unmake_move()
+            board.unmake_move()
+
+        return (next_move, iterations) if return_stats else next_move
+
+    def _tablebase_score(self, found, is_maximizing, ply):
+        """Turns a tablebase (result, distance) into a score from Red's point of view."""
+        result, distance = found
+        if result == DRAW:
+            return 0
+        score = TABLEBASE_WIN - ply - distance  # Prefer faster wins and slower losses
+        if result == LOSS:
+            score = -score
+        return score if is_maximizing else -score
+
+    def _tablebase_move(self, legal_moves):
+        """
+        Picks Red's move straight from the tablebase: the fastest win, else a draw,
+        else the slowest loss. Returns None if the position is not covered.
+        """
+        board = self.board
+        if (board.red | board.black).bit_count() > self.tablebase.max_pieces:
+            return None
+        best, best_rank = None, None
+        for move in legal_moves:
+            board.make_move(move)
+            found = self.tablebase.probe(board, 'B')
+            board.unmake_move()
+            if found is None:
+                return None
+            result, distance = found  # From Black's point of view
+            rank = (0, distance) if result == LOSS else (1, 0) if result == DRAW else (2, -distance)
+            if best_rank is None or rank < best_rank:
+                best, best_rank = move, rank
+        return best
+
+    def _search_root(self, legal_moves, depth):
+        """Searches every root move to the given depth; returns (best move, score)."""
+        board = self.board
         next_move = None
         best_score = -float('inf')
         alpha = -float('inf')
         beta = float('inf')
 
         for move in legal_moves:
-            board_copy = copy.deepcopy(self.board)
-            self.apply_move_to_board(move, board_copy)
-            original_board = self.board  # Save reference
-            self.board = board_copy  # Temporarily replace
-            score = self.minimax(depth=3, is_maximizing=False, alpha=alpha, beta=beta)
-            self.board = original_board  # Restore
-            
-            if score > best_score:
+            board.make_move(move)
+            score = self.minimax(depth - 1, is_maximizing=False, alpha=alpha, beta=beta)
+            board.unmake_move()
+
+            if next_move is None or score > best_score:
                 best_score = score
                 next_move = move
-            
+
             alpha = max(alpha, score)
             if beta <= alpha:
                 break  # Beta cutoff
 
-        return next_move
+        self.tt.store(position_key(board, 'R'), depth, best_score, EXACT, next_move)
+        return next_move, best_score
+
+    def _search_root_parallel(self, legal_moves, depth):
+        """
+        Root splitting: scores the root moves in worker processes and returns
+        (best move, score, principal variation).
+        Normally the first move is searched here and the others are sent out with its
+        score as alpha. In deterministic mode every move is searched with a full window
+        and a fresh transposition table, so the choice matches the in-process search.
+        """
+        if self._pool is None:
+            self._stop_value = multiprocessing.RawValue('q', 0)
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_search_worker,
+                                             initargs=(self.tt_size, self.tablebase, self.quiescence_depth,
+                                                       self._stop_value))
+        self._stop_id += 1
+        board = self.board
+        position = board.bitboards()
+
+        results = []
+        alpha = -float('inf')
+        if not self.deterministic:
+            # Search the eldest brother first to get a bound for the rest
+            first = legal_moves[0]
+            board.make_move(first)
+            score = self.minimax(depth - 1, is_maximizing=False)
+            board.unmake_move()
+            results.append((first, score, self.principal_variation(first, depth)))
+            alpha = score
+            remaining = legal_moves[1:]
+        else:
+            remaining = legal_moves
+
+        budget = None
+        if self._deadline is not None:
+            budget = self._deadline - time.perf_counter()
+        futures = [self._pool.submit(_search_root_move, position, move, depth, alpha, self.weights,
+                                     budget, self.deterministic, self._stop_id)
+                   for move in remaining]
+
+        # Wait for the workers, but no longer than the deadline (which stop() may move up)
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+                if any(future.result() is None for future in done):
+                    raise SearchTimeout
+                if self._deadline is not None and time.perf_counter() > self._deadline:
+                    raise SearchTimeout
+        except SearchTimeout:
+            # Free the pool for the next search: drop the moves not started, stop the running ones
+            self._stop_value.value = self._stop_id
+            for future in pending:
+                future.cancel()
+            raise
+
+        for move, future in zip(remaining, futures):
+            score, nodes, quiescence_nodes, pv = future.result()
+            self.nodes += nodes
+            self.quiescence_nodes += quiescence_nodes
+            results.append((move, score, pv))
+
+        # Keep the first best move in root order, as the in-process search does
+        next_move, best_score, best_pv = results[0]
+        for move, score, pv in results[1:]:
+            if score > best_score:
+                next_move, best_score, best_pv = move, score, pv
+
+        self.tt.store(position_key(board, 'R'), depth, best_score, EXACT, next_move)
+        return next_move, best_score, best_pv
+
+    def principal_variation(self, first_move, depth):
+        """Follows the transposition table's best moves from the position after first_move."""
+        board = self.board
+        pv = [first_move]
+        board.make_move(first_move)
+        player = 'B'
+        while len(pv) < depth:
+            entry = self.tt.peek(position_key(board, player))
+            if entry is None or entry[4] is None:
+                break
+            pv.append(entry[4])
+            board.make_move(entry[4])
+            player = 'R' if player == 'B' else 'B'
+        for _ in pv:
+            board.unmake_move()
+        return pv
 
     def apply_move_to_board(self, move, board):
         """Apply the move to the given board (modifies the board in place)."""
-        start_pos, end_pos = move
-        board.board[end_pos[0]][end_pos[1]] = board.board[start_pos[0]][start_pos[1]]
-        board.board[start_pos[0]][start_pos[1]] = 'X'
+        start_pos, end_pos = move[0], move[-1]
+        end = square_bit(*end_pos)
+        board._relocate(square_bit(*start_pos), end)
 
-        # Handle jump move
-        if abs(start_pos[0] - end_pos[0]) == 2:
-            mid_row = (start_pos[0] + end_pos[0]) // 2
-            mid_col = (start_pos[1] + end_pos[1]) // 2
-            board.board[mid_row][mid_col] = 'X'
+        # Handle jump moves, one hop at a time
+        for (from_r, from_c), (to_r, to_c) in zip(move, move[1:]):
+            if abs(to_r - from_r) == 2:
+                board._remove(square_bit((from_r + to_r) // 2, (from_c + to_c) // 2))
 
         # Handle King Promotion
-        if not board.is_king(end_pos[0], end_pos[1]):
-            if board.board[end_pos[0]][end_pos[1]] == 'R' and end_pos[0] == 7:
-                board.board[end_pos[0]][end_pos[1]] = 'RK'
-            elif board.board[end_pos[0]][end_pos[1]] == 'B' and end_pos[0] == 0:
-                board.board[end_pos[0]][end_pos[1]] = 'BK'
\ No newline at end of file
+        if not board.kings & end:
+            if (board.red & end and end_pos[0] == 7) or (board.black & end and end_pos[0] == 0):
+                board._crown(end)
@@ -1,11 +1,62 @@
 import pygame as pg
+import os
 import sys
-from checkers import Board, Status, AI_Algo
+from concurrent.futures import ThreadPoolExecutor, wait
+from checkers import Board, Status, AI_Algo, bit_coords
+from opening_book import OpeningBook
+
+# Data files are looked up next to this file, so the game runs from any directory
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WEIGHTS_FILE = os.path.join(BASE_DIR, "weights.json")  # Tuned evaluation weights (see tune.py), used when present
+BOOK_FILE = os.path.join(BASE_DIR, "opening.ckbk")  # See opening_book.py, used when present
+
+# Animation and message timings, in milliseconds
+MOVE_MS = 225  # One hop of a moving piece
+STATUS_MS = 1000  # Status messages such as an invalid move
+WINNER_MS = 2000  # The winner message; the game then starts over
+FADE_MS = 400  # Messages fade out over their last FADE_MS
+
+
+ASSETS_DIR = os.path.join(BASE_DIR, "assets")
+
+_images = {}  # (file name, size) -> scaled and converted Surface, loaded once per process
+_fonts = {}  # Font size -> Font
+
+
+def load_image(name, size):
+    """
+    Loads an image from ASSETS_DIR scaled to size, converted to the display's pixel
+    format (with per-pixel alpha for PNGs) so blitting it is fast. Images are cached,
+    so each is read and scaled only once per process. Needs an open display.
+    """
+    key = (name, size)
+    if key not in _images:
+        image = pg.image.load(os.path.join(ASSETS_DIR, name))
+        image = image.convert_alpha() if name.endswith(".png") else image.convert()
+        _images[key] = pg.transform.scale(image, size)
+    return _images[key]
+
+
+def load_font(size):
+    """The default font at size, created once per process."""
+    if size not in _fonts:
+        if not pg.font.get_init():
+            pg.font.init()
+        _fonts[size] = pg.font.Font(None, size)
+    return _fonts[size]
 
 
 class GameRenderer:
-    def __init__(self):
-        pg.init()
+    def __init__(self, dirty_rects=True, headless=False):
+        """
+        Only works out sizes: the window is opened and the images loaded by open(),
+        which the drawing methods call the first time they are used.
+
+        Parameters:
+        dirty_rects (bool): Redraw only the squares that changed; False redraws the whole window every frame.
+        headless (bool): Use SDL's dummy video driver, which draws without a window (tests, servers).
+        """
+        self.headless = headless
 
         # Set dynamic screen size
         self.WIDTH, self.HEIGHT = 600, 600
@@ -14,29 +65,132 @@ class GameRenderer:
         self.CELL_WIDTH = self.WIDTH // 8
         self.CELL_HEIGHT = self.HEIGHT // 8
 
-        # Thickness of the border
-        BORDER_WIDTH = 3
+        self.SCREEN = None  # Set by open()
+
+        # Dirty-rectangle mode: SCENE holds the board as last drawn, and only the squares
+        # whose piece or highlight changed are redrawn and sent to the display
+        self.dirty_rects = dirty_rects
+        self.drawn = None  # (red, black, kings, highlighted squares, hidden squares) in SCENE; None redraws everything
+        self.overlays = []  # Screen rects drawn over SCENE (messages, moving pieces), restored on the next render
+
+        # Scheduled on pg.time.get_ticks() and drawn by render_board, so nothing blocks the game loop
+        self.animations = []  # (image, start center, end center, start ms, end ms, end square) per hop
+        self.messages = []  # (text surface, rect, start ms, end ms)
+
+    def open(self):
+        """Opens the window and loads the images, unless that was done already."""
+        if self.SCREEN is not None:
+            return
+        if self.headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+        pg.init()  # Display and fonts, and the timer that pg.time.get_ticks() reads
 
         # Initialize Pygame window
         self.SCREEN = pg.display.set_mode((self.WIDTH, self.HEIGHT))
         pg.display.set_caption("Checkers!")
 
-        # Load Images
-        self.BOARD = pg.image.load("assets/Board.jpg")
-        self.B_KING = pg.image.load("assets/Black_King.png")
-        self.B_PIECE = pg.image.load("assets/Black_Piece.png")
-        self.R_KING = pg.image.load("assets/Red_King.png")
-        self.R_PIECE = pg.image.load("assets/Red_Piece.png")
-
-        # Transform images to fit size
-        self.BOARD = pg.transform.scale(self.BOARD, (self.WIDTH, self.HEIGHT))
-        self.B_PIECE = pg.transform.scale(self.B_PIECE, (self.CELL_WIDTH, self.CELL_HEIGHT))
-        self.R_PIECE = pg.transform.scale(self.R_PIECE, (self.CELL_WIDTH, self.CELL_HEIGHT))
-        self.B_KING = pg.transform.scale(self.B_KING, (self.CELL_WIDTH, self.CELL_HEIGHT))
-        self.R_KING = pg.transform.scale(self.R_KING, (self.CELL_WIDTH, self.CELL_HEIGHT))
+        # Load Images, scaled to fit size
+        cell = (self.CELL_WIDTH, self.CELL_HEIGHT)
+        self.BOARD = load_image("Board.jpg", (self.WIDTH, self.HEIGHT))
+        self.B_KING = load_image("Black_King.png", cell)
+        self.B_PIECE = load_image("Black_Piece.png", cell)
+        self.R_KING = load_image("Red_king.png", cell)
+        self.R_PIECE = load_image("Red_Piece.png", cell)
+        self.PIECE_IMAGES = {'B': self.B_PIECE, 'R': self.R_PIECE, 'BK': self.B_KING, 'RK': self.R_KING}
+
+        self.BACKGROUND = self.BOARD.copy()  # Static board, composited once
+        self.SCENE = self.BACKGROUND.copy()
+        self.drawn = None
+
+    def cell_rect(self, r, c):
+        return pg.Rect(c * self.CELL_WIDTH, r * self.CELL_HEIGHT, self.CELL_WIDTH, self.CELL_HEIGHT)
+
+    def invalidate(self):
+        """Makes the next render_board redraw the whole window, e.g. after it was uncovered."""
+        self.drawn = None
+
+    def restore_overlays(self):
+        """Copies SCENE back over everything drawn on top of it; returns the rects to update."""
+        rects = self.overlays
+        for rect in rects:
+            self.SCREEN.blit(self.SCENE, rect, rect)
+        self.overlays = []
+        return rects
 
     # Render Board
     def render_board(self, board, highlight_move=None):
+        """
+        Draws one frame: the board, then the moving pieces and the messages as they
+        are at the current time. Called every frame by the game loop.
+        """
+        self.open()
+        now = pg.time.get_ticks()
+        self.animations = [anim for anim in self.animations if anim[4] > now]
+        self.messages = [message for message in self.messages if message[3] > now]
+        hidden = frozenset(anim[5] for anim in self.animations)  # Pieces still on their way are drawn moving
+
+        if self.dirty_rects:
+            rects = self.draw_changes(board, highlight_move, hidden)
+        else:
+            self.render_full_board(board, highlight_move, hidden)
+
+        overlays = []
+        for image, start, end, start_ms, end_ms, _ in self.animations:
+            if start_ms > now:
+                continue  # Queued behind an earlier hop
+            t = (now - start_ms) / (end_ms - start_ms)
+            center = (round(start[0] + (end[0] - start[0]) * t), round(start[1] + (end[1] - start[1]) * t))
+            overlays.append(self.SCREEN.blit(image, image.get_rect(center=center)))
+        for text, text_rect, start_ms, end_ms in self.messages:
+            text.set_alpha(round(255 * min(1, (end_ms - now) / FADE_MS)))  # Fades out over its last FADE_MS
+            overlays.append(self.SCREEN.blit(text, text_rect))
+
+        if not self.dirty_rects:
+            pg.display.update()  # Refresh the screen with new visuals
+        elif rects or overlays:
+            self.overlays = overlays
+            pg.display.update(rects + overlays)  # Only what changed reaches the display
+
+    def animating(self):
+        """True while a piece is still moving."""
+        return bool(self.animations)
+
+    def draw_changes(self, board, highlight_move=None, hidden=frozenset()):
+        """
+        Brings SCENE and the screen up to date with board and removes overlays,
+        redrawing only what changed. Pieces on the hidden squares are left out.
+        Returns the rects that still need a display update.
+        """
+        highlighted = frozenset(highlight_move or ())
+        state = (board.red, board.black, board.kings, highlighted, hidden)
+        rects = self.restore_overlays()
+        if state != self.drawn:
+            if self.drawn is None:
+                self.SCENE.blit(self.BACKGROUND, (0, 0))
+                squares = [(r, c) for r in range(8) for c in range(8)]
+            else:
+                red, black, kings, old_highlighted, old_hidden = self.drawn
+                changed = (red ^ board.red) | (black ^ board.black) | (kings ^ board.kings)
+                squares = set(highlighted ^ old_highlighted) | (hidden ^ old_hidden)
+                while changed:
+                    bit = changed & -changed
+                    changed ^= bit
+                    squares.add(bit_coords(bit))
+
+            for r, c in squares:
+                rect = self.cell_rect(r, c)
+                self.SCENE.blit(self.BACKGROUND, rect, rect)
+                if (r, c) in highlighted:
+                    pg.draw.rect(self.SCENE, (255, 255, 120, 200), rect, 10)  # Yellow border
+                image = self.PIECE_IMAGES.get(board.piece_at(r, c))
+                if image is not None and (r, c) not in hidden:
+                    self.SCENE.blit(image, image.get_rect(center=rect.center))
+                self.SCREEN.blit(self.SCENE, rect, rect)
+                rects.append(rect)
+            self.drawn = state
+        return rects
+
+    def render_full_board(self, board, highlight_move=None, hidden=()):
         self.SCREEN.fill((0,0,0))
         self.SCREEN.blit(self.BOARD, (0, 0))  # Draw the board image
         if highlight_move:
@@ -52,6 +206,8 @@ class GameRenderer:
 
         for i in range(8):
             for j in range(8):
+                if (i, j) in hidden:
+                    continue
                 if board.board[i][j] == 'B':  # Render 'Black Piece'
                     img_rect = self.B_PIECE.get_rect(center=(
                         j * self.CELL_WIDTH + self.CELL_WIDTH // 2, # X-coordinate (center of column)
@@ -77,72 +233,96 @@ class GameRenderer:
                     ))
                     self.SCREEN.blit(self.R_KING, img_rect)
 
-        pg.display.update()  # Refresh the screen with new visuals
-
     # Display Winner
-    def display_winner(self, winner):
-        font = pg.font.Font(None, 60)  # Load default font with size 60
-        text = font.render(winner, True, (255, 0, 0))  # Render text in red
-        text_rect = text.get_rect(center=(self.WIDTH // 2, self.HEIGHT // 2))  # Center the text
-
-        self.SCREEN.blit(text, text_rect)  # Draw text on the screen
-        pg.display.update()  # Refresh the display
-        pg.time.delay(2000)  # Give time to see the message
-
+    def display_winner(self, winner, duration_ms=WINNER_MS):
+        self.show_message(winner, duration_ms)
 
     # Display Invalid Move
-    def display_status(self, msg):
-        font = pg.font.Font(None, 60)  # Load default font with size 60
+    def display_status(self, msg, duration_ms=STATUS_MS):
+        self.show_message(msg, duration_ms)
+
+    def show_message(self, msg, duration_ms):
+        """Shows msg in the middle of the board for duration_ms, fading out at the end."""
+        self.open()
+        font = load_font(60)  # Default font with size 60
         text = font.render(msg, True, (255, 0, 0))  # Render text in red
         text_rect = text.get_rect(center=(self.WIDTH // 2, self.HEIGHT // 2))  # Center the text
-
-        self.SCREEN.blit(text, text_rect)  # Draw text on the screen
-        pg.display.update()  # Refresh the display
-        pg.time.delay(100)
-
-    def animate_piece_move(self, board, piece_type, start_pos, end_pos):
-        start_x = start_pos[1] * self.CELL_WIDTH + self.CELL_WIDTH // 2
-        start_y = start_pos[0] * self.CELL_HEIGHT + self.CELL_HEIGHT // 2
-        end_x = end_pos[1] * self.CELL_WIDTH + self.CELL_WIDTH // 2
-        end_y = end_pos[0] * self.CELL_HEIGHT + self.CELL_HEIGHT // 2
-
-        if piece_type == 'B':
-            image = self.B_PIECE
-        elif piece_type == 'R':
-            image = self.R_PIECE
-        elif piece_type == 'BK':
-            image = self.B_KING
-        elif piece_type == 'RK':
-            image = self.R_KING
-        else:
+        now = pg.time.get_ticks()
+        self.messages = [(text, text_rect, now, now + duration_ms)]  # Replaces the message shown before
+
+    def animate_piece_move(self, piece_type, start_pos, end_pos, duration_ms=MOVE_MS):
+        """
+        Slides a piece from start_pos to end_pos over duration_ms, after any hop already
+        moving. The board should already hold the move; the piece is drawn at end_pos
+        once it gets there.
+        """
+        self.open()
+        image = self.PIECE_IMAGES.get(piece_type)
+        if image is None:
             return
-
-        frames = 15
-        for frame in range(frames):
-            t = frame / frames
-            current_x = start_x + (end_x - start_x) * t
-            current_y = start_y + (end_y - start_y) * t
-
-            self.render_board(board)  # Redraw full board in the background
-            img_rect = image.get_rect(center=(int(current_x), int(current_y)))
-            self.SCREEN.blit(image, img_rect)
-
-            pg.display.update()
-            pg.time.delay(15)  # Control animation speed
+        start_ms = max([pg.time.get_ticks()] + [anim[4] for anim in self.animations])
+        self.animations.append((image, self.cell_rect(*start_pos).center, self.cell_rect(*end_pos).center,
+                                start_ms, start_ms + duration_ms, tuple(end_pos)))
 
 
 class Game():
-    def __init__(self):
+    def __init__(self, headless=False):
         self.board = Board()
-        self.renderer = GameRenderer()
-        self.ai = AI_Algo(self.board)
+        self.renderer = GameRenderer(headless=headless)
+        # The AI searches its own copy of the position in a background thread,
+        # so the game board can be drawn and animated while it thinks
+        self.ai = AI_Algo(Board(), weights=WEIGHTS_FILE if os.path.exists(WEIGHTS_FILE) else None,
+                          book=OpeningBook(BOOK_FILE) if os.path.exists(BOOK_FILE) else None)
+        self.ai_thread = ThreadPoolExecutor(max_workers=1)
+        self.ai_search = None  # Future of the running best_move
+        self.reset_at = None  # pg.time.get_ticks() time at which a finished game starts over
         self.to_move = 'B'
 
     def reset_game(self):
+        self.cancel_ai()
+        self.ai.stop_pondering()
         self.board.reset()
         self.to_move = 'B'
+        self.reset_at = None
         self.renderer.render_board(self.board)
 
+    def start_ai(self):
+        """Starts the AI's search for a move from the current position."""
+        self.ai.board.load_bitboards(*self.board.bitboards())
+        self.ai_search = self.ai_thread.submit(self.ai.best_move)
+
+    def cancel_ai(self):
+        """Ends a running AI search and drops its move."""
+        search, self.ai_search = self.ai_search, None
+        while search is not None and not search.done():
+            self.ai.stop()  # Repeated in case the search had not set its deadline yet
+            wait([search], 0.01)
+
+    def play_ai_move(self):
+        """Plays the move the finished AI search found; a multi-jump is animated hop by hop."""
+        ai_move, self.ai_search = self.ai_search.result(), None
+        if isinstance(ai_move, list):  # best_move returns a score when Red has no move
+            piece = self.board.board[ai_move[0][0]][ai_move[0][1]]
+            for start_ai, end_ai in zip(ai_move, ai_move[1:]):
+                self.board.move_piece(start_ai, end_ai, 'R')
+                self.renderer.animate_piece_move(piece, start_ai, end_ai)
+
+        # Check if AI won
+        winner = self.board.check_winner()
+        if winner is not None:
+            self.end_game(winner)
+            return
+
+        # Switch back to player ('B'), and let the AI think on the player's time
+        self.to_move = 'B'
+        self.ai.board.load_bitboards(*self.board.bitboards())
+        self.ai.start_pondering()
+
+    def end_game(self, winner):
+        """Shows the winner; the game loop starts a new game once the message is gone."""
+        self.renderer.display_winner(winner)
+        self.reset_at = pg.time.get_ticks() + WINNER_MS
+
     def user_input(self):
         mouse_c, mouse_r = pg.mouse.get_pos()
         col, row = mouse_c // self.renderer.CELL_WIDTH, mouse_r // self.renderer.CELL_HEIGHT
@@ -158,16 +338,23 @@ class Game():
         while True:
             for event in pg.event.get():
                 if event.type == pg.QUIT:
+                    self.cancel_ai()
+                    self.ai.close()
                     pg.quit()  
                     sys.exit()
 
+                if event.type == pg.VIDEOEXPOSE:
+                    self.renderer.invalidate()  # Window contents were lost
+
                 if event.type == pg.KEYDOWN:
                     if event.key == pg.K_r:  
                         self.reset_game()
                         move_in_progress = False
                         start_pos = None
+                        highlight_moves = []
 
-                if event.type == pg.MOUSEBUTTONDOWN:
+                # Clicks only count on the player's turn of a running game
+                if event.type == pg.MOUSEBUTTONDOWN and self.to_move == 'B' and self.reset_at is None:
                     if not move_in_progress:
                         start_pos = self.user_input()
                         move_in_progress = True
@@ -175,53 +362,24 @@ class Game():
                         
                         if piece and piece.startswith('B'):
                             highlight_moves = self.board.get_valid_moves(start_pos[0], start_pos[1])
-                        
-                        self.renderer.render_board(self.board,highlight_moves)
                     else:
                         end_pos = self.user_input()
                         moving_piece = self.board.board[start_pos[0]][start_pos[1]]
                         user_status = self.board.move_piece(start_pos, end_pos, self.to_move)
 
                         if user_status in (Status.VALID_MOVE, Status.WAS_CAPTURE_MOVE, Status.CAPTURE_AGAIN):
-                            self.renderer.animate_piece_move(self.board, moving_piece, start_pos, end_pos)
+                            self.renderer.animate_piece_move(moving_piece, start_pos, end_pos)
                             highlight_moves = []
                         
                         if user_status == Status.VALID_MOVE or user_status == Status.WAS_CAPTURE_MOVE:
-                            # Switch turn to AI ('R')
-                            self.to_move = 'R'
-                            self.renderer.render_board(self.board)
-                            
                             # Check if player ('B') won
                             winner = self.board.check_winner()
                             if winner is not None:
-                                self.renderer.display_winner(winner)
-                                self.reset_game()
-                                continue  # Skip AI move if game ended
-                            
-                            # AI's turn (with forced captures)
-                            ai_move = self.ai.best_move()  # Get initial AI move
-                            while ai_move:  # Loop while AI has valid moves
-                                start_ai, end_ai = ai_move
-                                ai_status = self.board.move_piece(start_ai, end_ai, 'R')
-                                self.renderer.render_board(self.board)  # Update display
-                                
-                                # Check if AI won
-                                winner = self.board.check_winner()
-                                if winner is not None:
-                                    self.renderer.display_winner(winner)
-                                    self.reset_game()
-                                    break
-                                
-                                # Check if AI can capture again from the new position
-                                if (ai_status==Status.CAPTURE_AGAIN) and self.board._can_capture_from_position(end_ai[0], end_ai[1], 'R'):
-                                    # Restrict next move to this piece's position
-                                    ai_move = self.ai.best_move(must_continue_from=end_ai)
-                                else:
-                                    break  # No more captures, exit loop
-                            
-                            # Switch back to player ('B') if game hasn't ended
-                            if self.board.check_winner() is None:
-                                self.to_move = 'B'
+                                self.end_game(winner)
+                            else:
+                                # AI's turn ('R'): it searches while the player's move is animated
+                                self.to_move = 'R'
+                                self.start_ai()
                         
                         elif user_status == Status.CAPTURE_FIRST:
                             self.renderer.display_status(Status.CAPTURE_FIRST.value)
@@ -239,8 +397,14 @@ class Game():
                         move_in_progress = False
                         start_pos = None
 
+            # The AI's move is played once it is found and the player's move has finished moving
+            if self.ai_search is not None and self.ai_search.done() and not self.renderer.animating():
+                self.play_ai_move()
+
+            if self.reset_at is not None and pg.time.get_ticks() >= self.reset_at:
+                self.reset_game()
 
-            # Render the board and any selection indicators
+            # Render the board, any selection indicators, moving pieces and messages
             self.renderer.render_board(self.board,highlight_moves)
             
             clock.tick(60)  # Cap at 60 FPS
@@ -0,0 +1,185 @@
+"""
+asyncio front end to the search.
+
+    engine = Engine()
+    result = await engine.analyse(board.bitboards(), Limit(depth=6, time_ms=500))
+
+Searches run in a thread pool, so the event loop stays responsive, and each
+search gets its own AI_Algo, so concurrent games do not wait for one another
+(the interpreter interleaves them). An analysis can be streamed, stopped early
+with its best move so far, or cancelled:
+
+    analysis = engine.start(position, Limit(time_ms=2000))
+    async for info in analysis:    # One dict per completed depth: depth, score, pv, ...
+        if good_enough(info):
+            analysis.stop()
+    result = await analysis.wait()
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from checkers import AI_Algo, Board, flip, flip_move
+
+
+class Limit:
+    """How long an analysis may search: up to depth plies and/or time_ms milliseconds."""
+
+    def __init__(self, depth=None, time_ms=None):
+        self.depth = depth
+        self.time_ms = time_ms
+
+
+class Analysis:
+    """
+    A running search started by Engine.start. Iterate over it for the statistics of each
+    completed depth; await wait() for the result.
+    """
+
+    def __init__(self, loop):
+        self.stopped = False
+        self._ai = None
+        self._loop = loop
+        self._infos = asyncio.Queue()
+        self._future = None
+
+    def stop(self):
+        """Ends the search early; wait() then returns the best move found so far."""
+        self.stopped = True
+        if self._ai is not None:
+            self._ai.stop()
+
+    def _publish(self, info):
+        """Called in the search thread; hands info over to the event loop."""
+        self._loop.call_soon_threadsafe(self._infos.put_nowait, info)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        info = await self._infos.get()
+        if info is None:
+            raise StopAsyncIteration
+        return info
+
+    async def wait(self):
+        """
+        Waits for the search to end. Cancelling the waiting task stops the search.
+
+        Returns:
+        dict: move (None if the side to move has no moves), score (from the side to
+        move's point of view), depth, pv, nodes, elapsed_ms and stopped. Depth, pv and
+        nodes describe the last completed iteration and are 0 or empty when the move
+        came from the book or tablebase.
+        """
+        try:
+            return await asyncio.shield(self._future)
+        except asyncio.CancelledError:
+            self.stop()
+            raise
+
+
+class Engine:
+    """Runs AI_Algo searches for asyncio code without blocking the event loop."""
+
+    def __init__(self, threads=None, **options):
+        """
+        Parameters:
+        threads (int): Searches that may run at once; None lets ThreadPoolExecutor choose.
+        options: Keyword arguments for every AI_Algo the engine creates (weights, tablebase, ...).
+        """
+        self._executor = ThreadPoolExecutor(max_workers=threads)
+        self._options = options
+        self._idle = []  # AI_Algo instances not searching, kept for their transposition tables
+        self._running = set()  # Analyses not finished yet
+        self._lock = threading.Lock()  # Guards _idle, _running and _closed
+        self._closed = False
+
+    def close(self):
+        """Stops running analyses and releases the AI_Algo instances (and their worker processes)."""
+        with self._lock:
+            self._closed = True
+            running = list(self._running)
+            idle, self._idle = self._idle, []
+        for analysis in running:
+            analysis.stop()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for ai in idle:
+            ai.close()
+
+    def start(self, position, limit=None, player='R'):
+        """
+        Starts analysing a position.
+
+        Parameters:
+        position (tuple or Board): The position, as Board.bitboards() ints or a Board.
+        limit (Limit): When to stop; None searches to depth 4 like best_move.
+        player (str): The side to move, 'R' or 'B'.
+
+        Returns:
+        Analysis: The running search.
+        """
+        if isinstance(position, Board):
+            position = position.bitboards()
+        if player == 'B':
+            position = flip(*position)  # AI_Algo plays Red
+        limit = limit or Limit(depth=4)
+        loop = asyncio.get_running_loop()
+        analysis = Analysis(loop)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('engine is closed')
+            self._running.add(analysis)
+        analysis._future = loop.run_in_executor(self._executor, self._search, analysis, position, limit, player)
+        return analysis
+
+    async def analyse(self, position, limit=None, player='R'):
+        """Analyses a position and returns the result of Analysis.wait()."""
+        return await self.start(position, limit, player).wait()
+
+    def _search(self, analysis, position, limit, player):
+        """Runs in a pool thread: one best_move with a borrowed AI_Algo."""
+        with self._lock:
+            ai = self._idle.pop() if self._idle else None
+        if ai is None:
+            ai = AI_Algo(Board(), **self._options)
+        try:
+            ai.board.load_bitboards(*position)
+            analysis._ai = ai
+
+            def on_iteration(info):
+                if analysis.stopped:
+                    ai.stop()  # In case stop() came before the search set its deadline
+                if player == 'B':
+                    info = dict(info, pv=[flip_move(move) for move in info['pv']])
+                analysis._publish(info)
+
+            move, iterations = ai.best_move(time_limit_ms=limit.time_ms,
+                                            max_depth=limit.depth if limit.depth is not None else 64,
+                                            return_stats=True, on_iteration=on_iteration)
+        finally:
+            analysis._ai = None
+            analysis._publish(None)
+            with self._lock:
+                self._running.discard(analysis)
+                closed = self._closed
+                if not closed:
+                    self._idle.append(ai)
+            if closed:
+                ai.close()
+
+        if not isinstance(move, list):
+            move = None  # best_move returns a score when there is no move
+        last = iterations[-1] if iterations else {}
+        if player == 'B':
+            move = move and flip_move(move)
+            last = dict(last, pv=[flip_move(m) for m in last.get('pv', [])])
+        return {
+            'move': move,
+            'score': last.get('score', 0),
+            'depth': last.get('depth', 0),
+            'pv': last.get('pv', []),
+            'nodes': sum(it['nodes'] + it['quiescence_nodes'] for it in iterations),
+            'elapsed_ms': last.get('elapsed_ms', 0.0),
+            'stopped': analysis.stopped,
+        }
@@ -0,0 +1,167 @@
+"""
+Headless AI-vs-AI matches.
+
+Plays many games between two AI_Algo settings in a process pool, without
+pygame or a display, and streams one JSON line per finished game.
+
+Each game is described by a spec dict:
+    {"game": 0, "seed": 0, "random_plies": 4, "max_plies": 200,
+     "red": {"depth": 4, "time_ms": null, "weights": {...}},
+     "black": {"depth": 3}}
+Every key is optional. random_plies opening moves are played at random (from
+seed) so that games between deterministic players differ. A game is a draw
+after max_plies plies or on the third repetition of a position.
+
+Usage: python match.py --games 1000 --red-depth 4 --black-depth 3 --output results.jsonl
+       python match.py --specs games.jsonl --workers 8 --output results.jsonl
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from checkers import AI_Algo, Board, flip, flip_move, load_weights, position_key
+
+PLAYER_NAMES = {'R': 'red', 'B': 'black'}
+
+
+def play_game(spec):
+    """
+    Plays one AI-vs-AI game.
+
+    Parameters:
+    spec (dict): Game settings, see the module docstring.
+
+    Returns:
+    dict: The game record: game, seed, result ("red", "black" or "draw"), plies,
+    moves, and per side its settings plus nodes searched and thinking time.
+    """
+    game = spec.get('game', 0)
+    seed = spec.get('seed', game)
+    random_plies = spec.get('random_plies', 0)
+    max_plies = spec.get('max_plies', 200)
+    rng = random.Random(seed)
+
+    sides = {}
+    for player in ('R', 'B'):
+        settings = spec.get(PLAYER_NAMES[player]) or {}
+        ai = AI_Algo(Board(), weights=settings.get('weights'))
+        sides[player] = {
+            'ai': ai,
+            'depth': settings.get('depth', 4),
+            'time_ms': settings.get('time_ms'),
+            'nodes': 0,
+            'elapsed_ms': 0.0,
+        }
+
+    board = Board()
+    moves = []
+    seen = {}
+    result = 'draw'
+    for ply in range(max_plies):
+        player = 'R' if ply % 2 == 0 else 'B'
+        opponent = 'B' if player == 'R' else 'R'
+        legal_moves = board.get_legal_moves(player)
+        if not legal_moves:
+            result = PLAYER_NAMES[opponent]  # No pieces or no moves left
+            break
+
+        if ply < random_plies:
+            move = rng.choice(legal_moves)
+        else:
+            side = sides[player]
+            ai = side['ai']
+            if player == 'R':
+                ai.board.load_bitboards(*board.bitboards())
+            else:
+                ai.board.load_bitboards(*flip(*board.bitboards()))
+            start = time.perf_counter()
+            move, iterations = ai.best_move(time_limit_ms=side['time_ms'], max_depth=side['depth'],
+                                            return_stats=True)
+            side['elapsed_ms'] += (time.perf_counter() - start) * 1000
+            side['nodes'] += sum(it['nodes'] + it['quiescence_nodes'] for it in iterations)
+            if player == 'B':
+                move = flip_move(move)
+
+        board.make_move(move)
+        moves.append(move)
+
+        key = position_key(board, opponent)
+        seen[key] = seen.get(key, 0) + 1
+        if seen[key] == 3:
+            break  # Threefold repetition
+
+    record = {'game': game, 'seed': seed, 'result': result, 'plies': len(moves), 'moves': moves}
+    for player, side in sides.items():
+        settings = dict(spec.get(PLAYER_NAMES[player]) or {})
+        settings.update(nodes=side['nodes'], elapsed_ms=round(side['elapsed_ms'], 3))
+        record[PLAYER_NAMES[player]] = settings
+    return record
+
+
+def run_matches(specs, out, workers=None):
+    """
+    Plays every game of specs in a process pool and writes each record to out
+    as one JSON line, in the order the games finish.
+
+    Parameters:
+    specs (iterable): Game spec dicts.
+    out (file): Text stream the JSON lines are written to.
+    workers (int): Number of processes; None uses one per CPU.
+
+    Returns:
+    dict: Number of games won by "red", "black" and drawn ("draw").
+    """
+    totals = {'red': 0, 'black': 0, 'draw': 0}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_game, spec) for spec in specs]
+        for future in as_completed(futures):
+            record = future.result()
+            totals[record['result']] += 1
+            out.write(json.dumps(record) + '\n')
+            out.flush()
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play AI-vs-AI games without the UI.')
+    parser.add_argument('--specs', help='JSON lines file with one game spec per line')
+    parser.add_argument('--games', type=int, default=100, help='games to play without --specs (default 100)')
+    parser.add_argument('--red-depth', type=int, default=4, help='search depth of Red (default 4)')
+    parser.add_argument('--black-depth', type=int, default=4, help='search depth of Black (default 4)')
+    parser.add_argument('--time-ms', type=float, help='time limit per move for both sides')
+    parser.add_argument('--red-weights', help='JSON file of evaluation weights for Red')
+    parser.add_argument('--black-weights', help='JSON file of evaluation weights for Black')
+    parser.add_argument('--random-plies', type=int, default=4, help='random opening plies (default 4)')
+    parser.add_argument('--max-plies', type=int, default=200, help='plies before a draw is declared (default 200)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game (default 0)')
+    parser.add_argument('--workers', type=int, help='worker processes (default one per CPU)')
+    parser.add_argument('--output', default='-', help='JSON lines file to write (default stdout)')
+    args = parser.parse_args()
+
+    if args.specs:
+        with open(args.specs) as f:
+            specs = [json.loads(line) for line in f if line.strip()]
+    else:
+        red = {'depth': args.red_depth, 'time_ms': args.time_ms}
+        black = {'depth': args.black_depth, 'time_ms': args.time_ms}
+        for side, path in ((red, args.red_weights), (black, args.black_weights)):
+            if path:
+                side['weights'] = load_weights(path)
+        specs = [{'game': i, 'seed': args.seed + i, 'random_plies': args.random_plies,
+                  'max_plies': args.max_plies, 'red': red, 'black': black}
+                 for i in range(args.games)]
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        totals = run_matches(specs, out, args.workers)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print('red %(red)d, black %(black)d, draw %(draw)d' % totals, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Position and game notation.
+
+Squares are numbered 1-32 as in standard checkers notation, with Black's men
+starting on 1-12 and Red's on 21-32: square n is checkers.square_bit index
+32 - n. Red takes the place of White in FEN and PDN.
+
+    pack_position / unpack_position   13 bytes: the red, black and kings bitboards and the side to move
+    to_fen / from_fen                 "W:W21,22,K23:B1,2,3" (side to move, then each side's squares, K for kings)
+    read_pdn / write_pdn              PDN game records
+
+Games are dicts as written by match.py: moves (paths of (r, c) squares) and
+result ("red", "black", "draw" or None), plus optionally fen, the starting
+position (default START_FEN: the starting position with Red to move, as in
+match.py), and tags, the other PDN tags. In PDN a game without a FEN tag starts
+with Black to move, and results are written from Black's side, as Black moves
+first in the standard game: "1-0" is a Black win, "0-1" a Red win.
+"""
+import re
+import struct
+
+from checkers import Board, SQUARE_COORDS, square_bit
+
+POSITION = struct.Struct('<IIIB')  # red, black, kings, 1 if Black is to move
+FEN_SIDES = {'R': 'W', 'B': 'B'}
+FEN_PLAYERS = {'W': 'R', 'B': 'B'}
+START_FEN = 'W:W21,22,23,24,25,26,27,28,29,30,31,32:B1,2,3,4,5,6,7,8,9,10,11,12'
+PDN_START_FEN = 'B' + START_FEN[1:]  # The starting position of a PDN game without a FEN tag
+
+PDN_RESULTS = {'black': '1-0', 'red': '0-1', 'draw': '1/2-1/2', None: '*'}
+RESULTS_FROM_PDN = {'1-0': 'black', '2-0': 'black', '0-1': 'red', '0-2': 'red', '1/2-1/2': 'draw', '1-1': 'draw',
+                    '*': None}
+
+# Tags, comments {...}, variations ( ), annotations $n, move numbers, results and moves
+PDN_TOKEN = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]|\{[^}]*\}|;[^\n]*|(\()|(\))|\$\d+|\d+\.(?:\.\.)?'
+                       r'|(1-0|0-1|2-0|0-2|1/2-1/2|1-1|\*)(?![\d-])|(\d+(?:[-x:]\d+)+)|\S')
+
+
+def square_number(r, c):
+    """The standard notation number (1-32) of square (r, c)."""
+    return 32 - (square_bit(r, c).bit_length() - 1)
+
+
+def number_square(number):
+    """The (r, c) square with standard notation number 1-32."""
+    if not 1 <= number <= 32:
+        raise ValueError('no square %d' % number)
+    return SQUARE_COORDS[32 - number]
+
+
+def pack_position(board, player):
+    """
+    Packs a position into 13 bytes.
+
+    Parameters:
+    board (Board): The position.
+    player (str): The side to move, 'R' or 'B'.
+
+    Returns:
+    bytes: The packed position; equal positions always pack to equal bytes.
+    """
+    return POSITION.pack(board.red, board.black, board.kings, player == 'B')
+
+
+def unpack_position(data):
+    """
+    Inverse of pack_position.
+
+    Returns:
+    tuple: (Board, player to move).
+    """
+    red, black, kings, black_to_move = POSITION.unpack(data)
+    board = Board()
+    board.load_bitboards(red, black, kings)
+    return board, 'B' if black_to_move else 'R'
+
+
+def to_fen(board, player):
+    """
+    The FEN text of a position, with squares in ascending order.
+
+    Parameters:
+    board (Board): The position.
+    player (str): The side to move, 'R' or 'B'.
+
+    Returns:
+    str: For example "B:W21,22,K30:B1,K9" for Black to move.
+    """
+    fields = [FEN_SIDES[player]]
+    for side, pieces in (('W', board.red), ('B', board.black)):
+        squares = []
+        for sq in range(31, -1, -1):  # Ascending square numbers
+            bit = 1 << sq
+            if pieces & bit:
+                squares.append(('K%d' if board.kings & bit else '%d') % (32 - sq))
+        fields.append(side + ','.join(squares))
+    return ':'.join(fields)
+
+
+def from_fen(text):
+    """
+    Reads a FEN position. Ranges such as W21-32 and a trailing full stop are accepted.
+
+    Returns:
+    tuple: (Board, player to move).
+    """
+    fields = text.strip().strip('"').rstrip('.').split(':')
+    side = fields[0].strip().upper()
+    if side not in FEN_PLAYERS:
+        raise ValueError('bad side to move in FEN %r' % text)
+    pieces = {'W': 0, 'B': 0}
+    kings = 0
+    for field in fields[1:]:
+        field = field.strip()
+        if not field:
+            continue
+        colour = field[0].upper()
+        if colour not in pieces:
+            raise ValueError('bad colour in FEN %r' % text)
+        for item in field[1:].split(','):
+            item = item.strip()
+            if not item:
+                continue
+            king = item[0].upper() == 'K'
+            first, _, last = item.lstrip('Kk').partition('-')
+            for number in range(int(first), int(last.lstrip('Kk') or first) + 1):
+                bit = square_bit(*number_square(number))
+                pieces[colour] |= bit
+                if king:
+                    kings |= bit
+    if pieces['W'] & pieces['B']:
+        raise ValueError('square of both colours in FEN %r' % text)
+    board = Board()
+    board.load_bitboards(pieces['W'], pieces['B'], kings)
+    return board, FEN_PLAYERS[side]
+
+
+def move_text(move):
+    """A move path in notation: 11-15 for a move, 15x24x31 for captures."""
+    capture = abs(move[1][0] - move[0][0]) == 2
+    return ('x' if capture else '-').join(str(square_number(r, c)) for r, c in move)
+
+
+def parse_move(text, board, player):
+    """
+    Finds the legal move of player that text names. A multi-jump may be given by
+    every square it visits or only by its first and last.
+
+    Returns:
+    list: The move path.
+    """
+    numbers = [int(n) for n in re.split('[-x:]', text)]
+    squares = [number_square(n) for n in numbers]
+    matches = [move for move in board.get_legal_moves(player)
+               if move == squares or (len(squares) == 2 and move[0] == squares[0] and move[-1] == squares[-1])]
+    if len(matches) != 1:
+        raise ValueError('%s move %r' % ('ambiguous' if matches else 'illegal', text))
+    return matches[0]
+
+
+def write_pdn(game, f):
+    """
+    Writes a game as PDN.
+
+    Parameters:
+    game (dict): The game, see the module docstring.
+    f (file): Text stream written to.
+    """
+    board, player = from_fen(game.get('fen', START_FEN))
+    fen = to_fen(board, player)  # In canonical form
+    tags = dict(game.get('tags') or {})
+    tags.setdefault('GameType', '21')  # English draughts
+    if fen != PDN_START_FEN:
+        tags['FEN'] = fen
+    result = PDN_RESULTS[game.get('result')]
+    tags['Result'] = result
+    for key, value in tags.items():
+        f.write('[%s "%s"]\n' % (key, str(value).replace('\\', '\\\\').replace('"', '\\"')))
+
+    tokens = []
+    number = 1
+    for i, move in enumerate(game['moves']):
+        if player == 'B':
+            tokens.append('%d.' % number)
+        elif i == 0:
+            tokens.append('%d...' % number)
+        tokens.append(move_text(move))
+        if player == 'R':
+            number += 1
+        player = 'B' if player == 'R' else 'R'
+    tokens.append(result)
+
+    line = ''
+    for token in tokens:
+        if line and len(line) + 1 + len(token) > 79:
+            f.write(line + '\n')
+            line = token
+        else:
+            line = line + ' ' + token if line else token
+    f.write(line + '\n\n')
+
+
+def read_pdn(f):
+    """
+    Reads the games of a PDN stream one at a time. Comments, variations and
+    annotations are skipped.
+
+    Parameters:
+    f (file): Text stream, read lazily.
+
+    Yields:
+    dict: Each game, see the module docstring; tags holds the tags other than FEN and Result.
+    """
+    lines = []
+    in_movetext = False
+    for line in f:
+        if line.lstrip().startswith('[') and in_movetext:
+            yield _parse_game(''.join(lines))
+            lines = []
+            in_movetext = False
+        lines.append(line)
+        if line.strip() and not line.lstrip().startswith('['):
+            in_movetext = True
+    if in_movetext:
+        yield _parse_game(''.join(lines))
+
+
+def _parse_game(text):
+    """Parses the PDN text of one game."""
+    tags = {}
+    moves = []
+    result = None
+    depth = 0  # Nesting of variations, which are skipped
+    board = player = None
+    for match in PDN_TOKEN.finditer(text):
+        tag, value, open_variation, close_variation, result_text, move = match.groups()
+        if open_variation:
+            depth += 1
+        elif close_variation:
+            depth -= 1
+        elif depth:
+            continue
+        elif tag:
+            tags[tag] = re.sub(r'\\(.)', r'\1', value)
+        elif result_text:
+            result = RESULTS_FROM_PDN[result_text]
+        elif move:
+            if board is None:
+                board, player = from_fen(tags.get('FEN', PDN_START_FEN))
+            path = parse_move(move, board, player)
+            board.make_move(path)
+            moves.append(path)
+            player = 'B' if player == 'R' else 'R'
+
+    fen = to_fen(*from_fen(tags.pop('FEN', PDN_START_FEN)))  # In canonical form
+    if 'Result' in tags:
+        result = RESULTS_FROM_PDN.get(tags.pop('Result'), result)
+    return {'fen': fen, 'moves': moves, 'result': result, 'tags': tags}
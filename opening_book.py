@@ -0,0 +1,240 @@
+"""
+Opening book for the standard starting position.
+
+build() walks the opening tree from Board.reset() for the book side, Red (the
+side AI_Algo plays), both when Red moves first (match.py) and when Black does
+(the UI). At Red's positions it scores every move with a deep search and keeps
+the few moves close to the best one, weighted by how close they are; at
+Black's it follows every reply, so whatever the opponent plays stays in the
+book. The result is written as a file of fixed-size records sorted by Zobrist
+key. OpeningBook memory-maps that file and finds a position's moves by binary
+search, so nothing is parsed into Python objects up front.
+
+Usage: python opening_book.py [--plies 8] [--depth 6] [--moves 2] [--margin 20] [--workers N] [--output opening.ckbk]
+"""
+import argparse
+import mmap
+import os
+import random
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from checkers import AI_Algo, Board, SQUARE_COORDS, position_key, square_bit
+
+MAGIC = b'CKBK'
+VERSION = 1
+HEADER = struct.Struct('<4sHI')  # magic, version, number of records
+RECORD = struct.Struct('<QQH')  # position key, packed move, weight
+MAX_WEIGHT = 100
+
+
+def pack_move(move):
+    """Packs a move path into an int: its length in the low 4 bits, then 5 bits per square."""
+    packed = len(move)
+    for i, square in enumerate(move):
+        packed |= (square_bit(*square).bit_length() - 1) << (4 + 5 * i)
+    return packed
+
+
+def unpack_move(packed):
+    """Inverse of pack_move."""
+    return [SQUARE_COORDS[(packed >> (4 + 5 * i)) & 31] for i in range(packed & 15)]
+
+
+def score_moves(ai, player, depth):
+    """
+    Searches every legal move of player in ai's position.
+
+    Returns:
+    list: (score, move) pairs, best first, with scores from player's point of view.
+    """
+    board = ai.board
+    red = player == 'R'
+    scored = []
+    for move in board.get_legal_moves(player):
+        board.make_move(move)
+        score = ai.minimax(depth - 1, not red)
+        board.unmake_move()
+        scored.append((score if red else -score, move))
+    scored.sort(key=lambda pair: pair[0], reverse=True)
+    return scored
+
+
+def _score_position(position, player, depth):
+    """Worker side of build(): score_moves for a position given as Board.bitboards() ints."""
+    board = Board()
+    board.load_bitboards(*position)
+    return score_moves(AI_Algo(board), player, depth)
+
+
+def build(path, plies=8, depth=6, moves=2, margin=20, workers=None, progress=None):
+    """
+    Builds the opening book and writes it to path.
+
+    Parameters:
+    path (str): File to write.
+    plies (int): Depth of the opening tree, in plies from the starting position.
+    depth (int): Search depth used to score the moves of each book position.
+    moves (int): Most moves kept per Red position; each is followed further down the tree.
+    margin (float): Keep only moves scoring within this much of the best one.
+    workers (int): Processes scoring positions; None uses one per CPU.
+    progress (callable): Called as progress(positions done, positions queued) after each position.
+    """
+    records = []
+    booked = set()  # Keys of the Red positions already scored
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for first in ('R', 'B'):
+            board = Board()
+            frontier = {position_key(board, first): board.bitboards()}  # Positions of the current ply by key
+
+            for ply in range(plies):
+                player = first if ply % 2 == 0 else ('B' if first == 'R' else 'R')
+                opponent = 'B' if player == 'R' else 'R'
+                last_ply = ply + 1 == plies
+                next_frontier = {}
+
+                def follow(move):
+                    board.make_move(move)
+                    next_frontier[position_key(board, opponent)] = board.bitboards()
+                    board.unmake_move()
+
+                if player == 'B':
+                    # Every reply of the opponent
+                    if not last_ply:
+                        for position in frontier.values():
+                            board.load_bitboards(*position)
+                            for move in board.get_legal_moves(player):
+                                follow(move)
+                    frontier = next_frontier
+                    continue
+
+                todo = [(key, position) for key, position in frontier.items() if key not in booked]
+                booked.update(key for key, _ in todo)
+                scores = pool.map(_score_position, [position for _, position in todo], repeat(player),
+                                  repeat(depth), chunksize=max(1, len(todo) // (4 * (workers or os.cpu_count()))))
+                for i, ((key, position), scored) in enumerate(zip(todo, scores)):
+                    board.load_bitboards(*position)
+                    if scored:
+                        best = scored[0][0]
+                        for score, move in scored[:moves]:
+                            if best - score > margin:
+                                break
+                            weight = max(1, round(MAX_WEIGHT * (1 - (best - score) / (margin + 1))))
+                            records.append((key, pack_move(move), weight))
+                            if not last_ply:
+                                follow(move)
+                    done += 1
+                    if progress is not None:
+                        progress(done, len(todo) - i - 1)
+                frontier = next_frontier
+
+    records.sort()
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(records)))
+        for record in records:
+            f.write(RECORD.pack(*record))
+
+
+class OpeningBook:
+    """Read-only, memory-mapped view of a book file written by build()."""
+
+    def __init__(self, path):
+        """
+        Parameters:
+        path (str): Book file written by build().
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.size = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a version {VERSION} opening book')
+
+    def close(self):
+        self._data.close()
+
+    def __getstate__(self):
+        return {'path': self.path}  # Other processes map the file themselves
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    def _key_at(self, i):
+        return RECORD.unpack_from(self._data, HEADER.size + i * RECORD.size)[0]
+
+    def lookup(self, board, player):
+        """
+        Finds the book moves of a position.
+
+        Parameters:
+        board (Board): The position.
+        player (str): The side to move, 'R' or 'B'.
+
+        Returns:
+        list: (move, weight) pairs; empty if the position is not in the book.
+        """
+        key = position_key(board, player)
+
+        # Binary search for the first record of the key
+        low, high = 0, self.size
+        while low < high:
+            mid = (low + high) // 2
+            if self._key_at(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+
+        found = []
+        while low < self.size:
+            record_key, move, weight = RECORD.unpack_from(self._data, HEADER.size + low * RECORD.size)
+            if record_key != key:
+                break
+            found.append((unpack_move(move), weight))
+            low += 1
+        return found
+
+    def choose(self, board, player, legal_moves, rng=random):
+        """
+        Picks a book move at random in proportion to the weights.
+
+        Parameters:
+        board (Board): The position.
+        player (str): The side to move, 'R' or 'B'.
+        legal_moves (list): Moves allowed in the position; book moves outside it are ignored.
+        rng (random.Random): Source of randomness, or None to always take the heaviest move.
+
+        Returns:
+        list: The chosen move, or None if the book has no playable move for the position.
+        """
+        found = [(move, weight) for move, weight in self.lookup(board, player) if move in legal_moves]
+        if not found:
+            return None
+        if rng is None:
+            return max(found, key=lambda pair: pair[1])[0]
+        moves, weights = zip(*found)
+        return rng.choices(moves, weights)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the opening book.')
+    parser.add_argument('--plies', type=int, default=8, help='depth of the opening tree (default 8)')
+    parser.add_argument('--depth', type=int, default=6, help='search depth per position (default 6)')
+    parser.add_argument('--moves', type=int, default=2, help='most moves kept per Red position (default 2)')
+    parser.add_argument('--margin', type=float, default=20, help='largest score loss of a kept move (default 20)')
+    parser.add_argument('--workers', type=int, help='worker processes (default one per CPU)')
+    parser.add_argument('--output', default='opening.ckbk', help='file to write (default opening.ckbk)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+
+    def report(done, queued):
+        print('%d positions searched, %d queued, %.0fs' % (done, queued, time.perf_counter() - start))
+
+    build(args.output, args.plies, args.depth, args.moves, args.margin, args.workers, report)
+
+
+if __name__ == "__main__":
+    main()
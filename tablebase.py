@@ -0,0 +1,310 @@
+"""
+Endgame tablebase for positions with few pieces.
+
+generate() solves every position with up to max_pieces pieces by retrograde
+analysis and writes the results to a compact binary file. EndgameTablebase
+reads that file through a read-only memory map, so any number of processes
+probing it share one page-cached copy.
+
+The file is split into slices, one per material signature (red men, red kings,
+black men, black kings). Inside a slice every position has a fixed index built
+from the combinatorial rank of each kind's squares, Red-to-move positions first.
+Each position takes a little-endian 16-bit entry: the result for the side to
+move in the low two bits and the distance to the end of the game, in plies, in
+the other fourteen.
+
+Usage: python tablebase.py [--pieces 4] [--output endgame.cktb]
+"""
+import argparse
+import mmap
+import struct
+import sys
+import time
+from array import array
+from collections import defaultdict
+from itertools import combinations, product
+from math import comb
+
+from checkers import Board, UNKNOWN, WIN, LOSS, DRAW
+MAX_DISTANCE = (1 << 14) - 1
+
+MAGIC = b'CKTB'
+VERSION = 1
+HEADER = struct.Struct('<4sHH')  # magic, version, number of slices
+SLICE_ENTRY = struct.Struct('<4BQ')  # red men, red kings, black men, black kings, data offset
+ENTRY = struct.Struct('<H')
+
+# Squares each kind may stand on, as (first square, number of squares):
+# men never stand on their own crowning row
+KIND_DOMAINS = ((0, 28), (0, 32), (4, 28), (0, 32))
+
+COMB = [[comb(n, k) for k in range(33)] for n in range(33)]
+
+
+def signature(red, black, kings):
+    """Material signature (red men, red kings, black men, black kings) of a position."""
+    return ((red & ~kings).bit_count(), (red & kings).bit_count(),
+            (black & ~kings).bit_count(), (black & kings).bit_count())
+
+
+def signatures(max_pieces):
+    """
+    Every signature with both colours on the board and at most max_pieces pieces,
+    in an order where captures and promotions only lead to earlier signatures.
+    """
+    found = [sig for sig in product(range(max_pieces + 1), repeat=4)
+             if sig[0] + sig[1] and sig[2] + sig[3] and sum(sig) <= max_pieces]
+    found.sort(key=lambda sig: (sum(sig), sig[0] + sig[2], sig))
+    return found
+
+
+def slice_size(sig):
+    """Number of positions per side to move in the slice of sig."""
+    size = 1
+    for count, (_, span) in zip(sig, KIND_DOMAINS):
+        size *= COMB[span][count]
+    return size
+
+
+def _rank(pieces, first):
+    """Combinatorial rank of a set of squares, counted from square first."""
+    rank = 0
+    i = 1
+    while pieces:
+        bit = pieces & -pieces
+        pieces ^= bit
+        rank += COMB[bit.bit_length() - 1 - first][i]
+        i += 1
+    return rank
+
+
+def slice_index(sig, red, black, kings):
+    """Index of a position inside the slice of its signature sig."""
+    index = 0
+    for count, pieces, (first, span) in zip(sig, (red & ~kings, red & kings, black & ~kings, black & kings),
+                                            KIND_DOMAINS):
+        index = index * COMB[span][count] + _rank(pieces, first)
+    return index
+
+
+def _positions(sig):
+    """Yields (index, red, black, kings) for every position of the slice of sig."""
+    per_kind = []
+    for count, (first, span) in zip(sig, KIND_DOMAINS):
+        sets = []
+        for squares in combinations(range(first, first + span), count):
+            pieces = 0
+            for sq in squares:
+                pieces |= 1 << sq
+            sets.append((_rank(pieces, first), pieces))
+        per_kind.append((COMB[span][count], sets))
+
+    (_, red_men), (n1, red_kings), (n2, black_men), (n3, black_kings) = per_kind
+    for (r0, p0), (r1, p1), (r2, p2), (r3, p3) in product(red_men, red_kings, black_men, black_kings):
+        if p0 & p1 or (p0 | p1) & (p2 | p3) or p2 & p3:
+            continue  # Two pieces on one square
+        yield ((r0 * n1 + r1) * n2 + r2) * n3 + r3, p0 | p1, p2 | p3, p1 | p3
+
+
+def _solve_slice(sig, tables):
+    """
+    Solves every position of one slice; tables holds the slices solved so far.
+
+    Moves that capture or promote leave the slice and are looked up in tables.
+    The remaining moves form a graph inside the slice, which is solved backwards
+    from the decided positions in order of distance: a position wins as soon as
+    one successor is lost for the opponent, and loses once all its successors
+    are won for the opponent. Whatever is left undecided is a draw.
+    """
+    size = slice_size(sig)
+    values = array('H', [0]) * (2 * size)
+    valid = bytearray(2 * size)
+    unresolved = array('H', [0]) * (2 * size)  # Successors inside the slice not yet decided
+    longest = array('H', [0]) * (2 * size)  # Longest win among the decided successors
+    cannot_lose = bytearray(2 * size)  # Has a successor that is not a win for the opponent
+    sources, targets = array('l'), array('l')  # Moves inside the slice
+    pending = defaultdict(list)  # Distance -> positions decided at that distance
+    board = Board()
+
+    for index, red, black, kings in _positions(sig):
+        for side, player in enumerate(('R', 'B')):
+            node = side * size + index
+            valid[node] = 1
+            board.load_bitboards(red, black, kings)
+            moves = board.get_legal_moves(player)
+            if not moves:
+                pending[0].append((node, LOSS))
+                continue
+
+            fastest = None
+            for move in moves:
+                board.make_move(move)
+                child_red, child_black, child_kings = board.bitboards()
+                child_sig = signature(child_red, child_black, child_kings)
+                board.unmake_move()
+                if child_sig == sig:
+                    sources.append(node)
+                    targets.append((1 - side) * size + slice_index(sig, child_red, child_black, child_kings))
+                    unresolved[node] += 1
+                    continue
+
+                if not (child_black if player == 'R' else child_red):
+                    result, distance = LOSS, 0  # Captured the last enemy piece
+                else:
+                    entry = tables[child_sig][(1 - side) * slice_size(child_sig) +
+                                              slice_index(child_sig, child_red, child_black, child_kings)]
+                    result, distance = entry & 3, entry >> 2
+                if result == WIN:
+                    longest[node] = max(longest[node], distance)
+                else:
+                    cannot_lose[node] = 1
+                    if result == LOSS and (fastest is None or distance < fastest):
+                        fastest = distance
+
+            if fastest is not None:
+                pending[fastest + 1].append((node, WIN))
+            elif not unresolved[node] and not cannot_lose[node]:
+                pending[longest[node] + 1].append((node, LOSS))
+
+    # Predecessor lists of the moves inside the slice, grouped by target
+    starts = array('l', [0]) * (2 * size + 1)
+    for target in targets:
+        starts[target + 1] += 1
+    for node in range(2 * size):
+        starts[node + 1] += starts[node]
+    fill = array('l', starts)
+    predecessors = array('l', [0]) * len(sources)
+    for source, target in zip(sources, targets):
+        predecessors[fill[target]] = source
+        fill[target] += 1
+    del sources, targets, fill
+
+    distance = 0
+    while pending:
+        for node, result in pending.pop(distance, ()):
+            if values[node]:
+                continue
+            values[node] = result | min(distance, MAX_DISTANCE) << 2
+            for pred in predecessors[starts[node]:starts[node + 1]]:
+                if values[pred]:
+                    continue
+                if result == LOSS:
+                    pending[distance + 1].append((pred, WIN))
+                else:
+                    unresolved[pred] -= 1
+                    longest[pred] = max(longest[pred], distance)
+                    if not unresolved[pred] and not cannot_lose[pred]:
+                        pending[longest[pred] + 1].append((pred, LOSS))
+        distance += 1
+
+    for node in range(2 * size):
+        if valid[node] and not values[node]:
+            values[node] = DRAW
+    return values
+
+
+def generate(path, max_pieces=4, progress=None):
+    """
+    Solves every position with up to max_pieces pieces and writes the tablebase file.
+
+    Parameters:
+    path (str): File to write.
+    max_pieces (int): Largest number of pieces on the board, both colours together.
+    progress (callable): Called as progress(signature, seconds) after each slice.
+    """
+    tables = {}
+    for sig in signatures(max_pieces):
+        start = time.perf_counter()
+        tables[sig] = _solve_slice(sig, tables)
+        if progress is not None:
+            progress(sig, time.perf_counter() - start)
+
+    offset = HEADER.size + SLICE_ENTRY.size * len(tables)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(tables)))
+        for sig, values in tables.items():
+            f.write(SLICE_ENTRY.pack(*sig, offset))
+            offset += ENTRY.size * len(values)
+        for values in tables.values():
+            if sys.byteorder != 'little':
+                values.byteswap()
+            f.write(values.tobytes())
+
+
+class EndgameTablebase:
+    """
+    Read-only view of a tablebase file written by generate().
+    The file is memory-mapped, so opening it is cheap and the operating system
+    shares its pages between every process that probes it.
+    """
+
+    def __init__(self, path):
+        """
+        Parameters:
+        path (str): Tablebase file written by generate().
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a version {VERSION} tablebase file')
+
+        self.slices = {}  # Signature -> (offset, positions per side to move)
+        for i in range(count):
+            *sig, offset = SLICE_ENTRY.unpack_from(self._data, HEADER.size + i * SLICE_ENTRY.size)
+            self.slices[tuple(sig)] = (offset, slice_size(sig))
+        self.max_pieces = max(map(sum, self.slices), default=0)
+
+    def close(self):
+        self._data.close()
+
+    def __getstate__(self):
+        return {'path': self.path}  # Other processes map the file themselves
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    def probe(self, board, player):
+        """
+        Looks up a position.
+
+        Parameters:
+        board (Board): The position.
+        player (str): The side to move, 'R' or 'B'.
+
+        Returns:
+        tuple: (result, distance) with result WIN, LOSS or DRAW for the side to move and
+        distance the plies until the game ends, or None if the position is not covered.
+        """
+        red, black, kings = board.red, board.black, board.kings
+        if not (red if player == 'R' else black):
+            return LOSS, 0
+        if not (black if player == 'R' else red):
+            return None  # Game already over
+        sig = signature(red, black, kings)
+        found = self.slices.get(sig)
+        if found is None:
+            return None
+        offset, size = found
+        index = (player == 'B') * size + slice_index(sig, red, black, kings)
+        entry, = ENTRY.unpack_from(self._data, offset + ENTRY.size * index)
+        if entry & 3 == UNKNOWN:
+            return None
+        return entry & 3, entry >> 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate the endgame tablebase.')
+    parser.add_argument('--pieces', type=int, default=4, help='most pieces on the board (default 4)')
+    parser.add_argument('--output', default='endgame.cktb', help='file to write (default endgame.cktb)')
+    args = parser.parse_args()
+
+    def report(sig, seconds):
+        print('%d red men, %d red kings, %d black men, %d black kings: %.1fs' % (*sig, seconds))
+
+    generate(args.output, args.pieces, report)
+
+
+if __name__ == "__main__":
+    main()
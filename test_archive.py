@@ -0,0 +1,104 @@
+"""Round trips of the PDN and game archive formats (notation.py, archive.py)."""
+import io
+import os
+import random
+
+import pytest
+
+from archive import HEADER, OFFSET, ArchiveWriter, GameArchive
+from notation import PDN_START_FEN, START_FEN, from_fen, read_pdn, write_pdn
+
+
+def random_games(count, seed=0):
+    """Games of random legal moves, starting with either side, with every kind of result."""
+    rng = random.Random(seed)
+    games = []
+    for n in range(count):
+        fen = START_FEN if n % 2 == 0 else PDN_START_FEN
+        board, player = from_fen(fen)
+        moves = []
+        for _ in range(rng.randint(0, 120)):
+            legal_moves = board.get_legal_moves(player)
+            if not legal_moves:
+                break
+            move = rng.choice(legal_moves)
+            board.make_move(move)
+            moves.append(move)
+            player = 'B' if player == 'R' else 'R'
+        games.append({'fen': fen, 'moves': moves, 'result': ('red', 'black', 'draw', None)[n % 4],
+                      'tags': {'Event': 'game "%d"' % n} if n % 3 else {}})
+    return games
+
+
+def test_pdn_round_trip():
+    games = random_games(20)
+    f = io.StringIO()
+    for game in games:
+        write_pdn(game, f)
+    f.seek(0)
+    read = list(read_pdn(f))
+    for game in read:
+        assert game['tags'].pop('GameType') == '21'
+    assert read == games
+
+
+def test_pdn_skips_comments_and_variations():
+    text = ('[Event "x"]\n[Result "0-1"]\n'
+            '1. 11-15 {a comment (not a variation)} 23-19 (22-18 15x22) 2. 8-11! $3 22-17 ; to the end of the line\n'
+            '3. 9-13 0-1\n')
+    game, = read_pdn(io.StringIO(text))
+    assert game['result'] == 'red'
+    assert game['fen'] == PDN_START_FEN
+    assert game['tags'] == {'Event': 'x'}
+    assert len(game['moves']) == 5
+
+
+def test_archive_round_trip(tmp_path):
+    path = str(tmp_path / 'games.ckga')
+    games = random_games(30, seed=1)
+    with ArchiveWriter(path) as writer:
+        for n, game in enumerate(games[:20]):
+            assert writer.append(game) == n
+    with ArchiveWriter(path) as writer:  # Reopened for appending
+        for game in games[20:]:
+            writer.append(game)
+
+    with GameArchive(path) as archive:
+        assert len(archive) == len(games)
+        assert archive[7] == games[7]
+        assert archive[-1] == games[-1]
+        assert list(archive) == games
+        with pytest.raises(IndexError):
+            archive[len(games)]
+
+
+def test_reopen_truncated_archive(tmp_path):
+    path = str(tmp_path / 'games.ckga')
+    games = random_games(5, seed=2)
+    with ArchiveWriter(path) as writer:
+        for game in games:
+            writer.append(game)
+
+    # A crash in the middle of the last record: its index entry is there, its moves are not,
+    # and half of a further index entry was written
+    size = os.path.getsize(path)
+    with open(path, 'r+b') as f:
+        f.truncate(size - 1)
+    with open(path + '.idx', 'ab') as f:
+        f.write(b'\x00' * (OFFSET.size // 2))
+
+    with ArchiveWriter(path) as writer:
+        assert writer.count == 4
+        assert writer.append(games[4]) == 4
+    with GameArchive(path) as archive:
+        assert list(archive) == games
+    assert os.path.getsize(path + '.idx') == 5 * OFFSET.size
+
+
+def test_empty_archive(tmp_path):
+    path = str(tmp_path / 'games.ckga')
+    ArchiveWriter(path).close()
+    assert os.path.getsize(path) == HEADER.size
+    with GameArchive(path) as archive:
+        assert len(archive) == 0
+        assert list(archive) == []
@@ -0,0 +1,70 @@
+"""Move generation and incremental board state of checkers.Board."""
+import random
+
+import pytest
+
+from bench import PERFT_START, perft
+from checkers import Board, Status
+
+
+def random_positions(count, seed=0):
+    """Boards after random legal games of up to 80 plies, with the player to move."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        board = Board()
+        player = 'R'
+        for _ in range(rng.randint(0, 80)):
+            legal_moves = board.get_legal_moves(player)
+            if not legal_moves:
+                break
+            board.make_move(rng.choice(legal_moves))
+            player = 'B' if player == 'R' else 'R'
+        yield board, player
+
+
+@pytest.mark.parametrize('depth', range(6))
+def test_perft_start(depth):
+    assert perft(Board(), 'R', depth) == PERFT_START[depth]
+
+
+def test_make_unmake_round_trip():
+    rng = random.Random(1)
+    for board, player in random_positions(30, seed=1):
+        position = board.bitboards()
+        hash_, terms = board.hash, list(board.terms)
+        played = 0
+        for _ in range(rng.randint(1, 20)):
+            legal_moves = board.get_legal_moves(player)
+            if not legal_moves:
+                break
+            board.make_move(rng.choice(legal_moves))
+            played += 1
+            player = 'B' if player == 'R' else 'R'
+            assert board.hash == board.compute_hash()
+            assert board.terms == board.compute_terms()
+        for _ in range(played):
+            board.unmake_move()
+            assert board.hash == board.compute_hash()
+            assert board.terms == board.compute_terms()
+        assert board.bitboards() == position
+        assert (board.hash, board.terms) == (hash_, terms)
+
+
+def test_move_piece_matches_make_move():
+    for board, player in random_positions(60, seed=2):
+        for move in board.get_legal_moves(player):
+            expected = board.copy()
+            expected.make_move(move)
+            hopped = board.copy()
+            capture = abs(move[1][0] - move[0][0]) == 2
+            for i, (start, end) in enumerate(zip(move, move[1:])):
+                status = hopped.move_piece(start, end, player)
+                if not capture:
+                    assert status == Status.VALID_MOVE
+                elif i < len(move) - 2:
+                    assert status == Status.CAPTURE_AGAIN
+                else:
+                    assert status == Status.WAS_CAPTURE_MOVE
+            assert hopped.bitboards() == expected.bitboards()
+            assert hopped.hash == expected.hash == hopped.compute_hash()
+            assert hopped.terms == expected.terms
@@ -0,0 +1,133 @@
+"""
+Texel-style tuning of the evaluation weights.
+
+Replays the games of one or more match.py result files, takes every quiet
+position (no capture pending) together with the game's result, and fits the
+weights of batch_eval.BATCH_TERMS so that sigmoid(k * score) predicts the
+result: 1 for a Red win, 0.5 for a draw, 0 for a Black win. The scale k is
+fitted first with the starting weights and then held fixed, and the weights
+are fitted by full-batch gradient steps on the squared prediction error.
+
+The other weights are copied unchanged. The result is a JSON weights file for
+AI_Algo(weights=path), checkers.load_weights or match.py --red-weights.
+
+Usage: python tune.py results.jsonl [more.jsonl ...] [--output weights.json] [--steps 2000]
+"""
+import argparse
+import json
+
+import numpy as np
+
+from batch_eval import BATCH_TERMS, batch_terms, encode
+from checkers import Board, DEFAULT_WEIGHTS, load_weights
+
+RESULT_TARGETS = {'red': 1.0, 'draw': 0.5, 'black': 0.0}
+
+
+def load_samples(paths, skip_plies=8):
+    """
+    Replays match.py records into (position, result) samples.
+
+    Parameters:
+    paths (list): JSON lines files written by match.py.
+    skip_plies (int): Opening plies left out of each game.
+
+    Returns:
+    tuple: (positions, results) as an (N, 32) int8 array (see batch_eval.encode) and N targets.
+    """
+    positions = []
+    results = []
+    board = Board()
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                target = RESULT_TARGETS[record['result']]
+                board.reset()
+                player = 'R'
+                for ply, move in enumerate(record['moves']):
+                    board.make_move([tuple(square) for square in move])
+                    player = 'B' if player == 'R' else 'R'
+                    if ply + 1 >= skip_plies and not board.jumpers(player):
+                        positions.append(board.bitboards())
+                        results.append(target)
+    return encode(positions), np.array(results)
+
+
+def sigmoid(z):
+    return 0.5 * (1 + np.tanh(z / 2))  # 1 / (1 + exp(-z)) without overflow
+
+
+def prediction_error(scores, results, k):
+    """Mean squared error of sigmoid(k * scores) against the results."""
+    return np.mean((sigmoid(k * scores) - results) ** 2)
+
+
+def fit_scale(scores, results):
+    """The k of the sigmoid that best turns scores into results, searched on a log grid."""
+    grid = np.logspace(-5, 0, 101)
+    errors = [prediction_error(scores, results, k) for k in grid]
+    return grid[int(np.argmin(errors))]
+
+
+def fit(terms, results, weights, steps=2000, rate=1.0, k=None):
+    """
+    Fits the weights of the BATCH_TERMS columns of terms to the results.
+
+    Parameters:
+    terms (numpy.ndarray): (N, len(BATCH_TERMS)) unweighted terms, see batch_eval.batch_terms.
+    results (numpy.ndarray): N targets between 0 and 1.
+    weights (dict): Starting weights.
+    steps (int): Gradient steps.
+    rate (float): Step size, in units of the normalised terms.
+    k (float): Sigmoid scale; None fits it to the starting weights first.
+
+    Returns:
+    tuple: (fitted weights dict, k, error before, error after).
+    """
+    start = np.array([weights[key] for key in BATCH_TERMS])
+    if k is None:
+        k = fit_scale(terms @ start, results)
+
+    # Work on terms scaled to unit size, with k folded into the weights, so one
+    # step size suits every term
+    scale = np.sqrt(np.mean(terms ** 2, axis=0))
+    scale[scale == 0] = 1
+    x = terms / scale
+    v = start * scale * k
+    before = prediction_error(terms @ start, results, k)
+    for _ in range(steps):
+        p = sigmoid(x @ v)
+        gradient = x.T @ ((p - results) * p * (1 - p)) * (2 / len(results))
+        v -= rate * gradient
+
+    fitted = v / (scale * k)
+    tuned = dict(weights)
+    tuned.update((key, float(value)) for key, value in zip(BATCH_TERMS, fitted))
+    return tuned, k, before, prediction_error(terms @ fitted, results, k)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fit the evaluation weights to game results.')
+    parser.add_argument('results', nargs='+', help='match.py JSON lines files')
+    parser.add_argument('--weights', help='starting weights file (default DEFAULT_WEIGHTS)')
+    parser.add_argument('--output', default='weights.json', help='weights file to write (default weights.json)')
+    parser.add_argument('--steps', type=int, default=2000, help='gradient steps (default 2000)')
+    parser.add_argument('--rate', type=float, default=1.0, help='step size (default 1.0)')
+    parser.add_argument('--skip-plies', type=int, default=8, help='opening plies left out (default 8)')
+    args = parser.parse_args()
+
+    weights = load_weights(args.weights) if args.weights else dict(DEFAULT_WEIGHTS)
+    positions, results = load_samples(args.results, args.skip_plies)
+    tuned, k, before, after = fit(batch_terms(positions), results, weights, args.steps, args.rate)
+    print('%d positions, k=%.6f, error %.6f -> %.6f' % (len(results), k, before, after))
+
+    with open(args.output, 'w') as f:
+        json.dump(tuned, f, indent=4)
+        f.write('\n')
+
+
+if __name__ == "__main__":
+    main()